@@ -0,0 +1,138 @@
+import argparse
+import json
+import sys
+import time
+
+from Board import Board
+from ChessFunctionsAndConstants import *
+from Parallel import boundedMap
+from Pgn import readGames
+from San import moveToSan, parseSan
+from SearchLimits import searchPosition
+
+# Batch analysis of game collections. Games are read lazily from a PGN file and
+# spread over a pool of processes, each searching every position of a game under
+# the same budget. A worker keeps one Board, and with it one transposition table,
+# for all the games it analyses. The results are written as JSON lines in the order
+# the games finish, and new games are only read once earlier ones are written, so
+# memory stays bounded however large the collection is.
+
+# Moves losing this many centipawns against the best move are flagged. Scores are
+# clamped first, so that missing a mate counts as a blunder like losing a queen.
+MISTAKE_THRESHOLD = 100
+BLUNDER_THRESHOLD = 300
+SCORE_CLAMP = 1000
+
+WORKER_BOARD = None
+
+
+def workerBoard() -> Board:
+    # the Board of this process, created by the first game it analyses
+    global WORKER_BOARD
+    if WORKER_BOARD is None:
+        WORKER_BOARD = Board()
+    return WORKER_BOARD
+
+
+def analyseGame(
+    number: int, game, depth: int, nodes: int = None, seconds: float = None
+) -> dict:
+    # runs in a worker process, scores are in centipawns from white's point of view
+    board = workerBoard()
+    result = {"game": number, "headers": game.headers, "plies": []}
+    try:
+        board.setToFen(game.startingFen())
+        moves = []
+        for san in game.moves:
+            moves.append(parseSan(board, san))
+            board.make_move(moves[-1])
+        for move in moves:
+            board.unmake_move()
+    except ValueError as error:
+        result["error"] = str(error)
+        return result
+
+    # every position is searched once, the position after a move tells how good it
+    # was and the position before it which move was best
+    sign = 1 if board.currentTurn == WHITE else -1
+    score = sign * searchPosition(board, depth, nodes, seconds)
+    for ply, move in enumerate(moves, 1):
+        bestMove = board.bestMove
+        entry = {
+            "ply": ply,
+            "move": moveToSan(board, move),
+            "best": moveToSan(board, bestMove) if bestMove is not None else None,
+            "evalBefore": score,
+        }
+        board.make_move(move)
+        sign = -sign
+        score = sign * searchPosition(board, depth, nodes, seconds)
+        entry["eval"] = score
+
+        # the loss is seen from the side that moved
+        before = max(-SCORE_CLAMP, min(entry["evalBefore"], SCORE_CLAMP))
+        after = max(-SCORE_CLAMP, min(score, SCORE_CLAMP))
+        loss = max((before - after) * -sign, 0)
+        entry["loss"] = loss
+        entry["mistake"] = loss >= MISTAKE_THRESHOLD
+        entry["blunder"] = loss >= BLUNDER_THRESHOLD
+        result["plies"].append(entry)
+    return result
+
+
+def analyseGames(
+    games,
+    output,
+    depth: int,
+    nodes: int = None,
+    seconds: float = None,
+    workers: int = None,
+) -> dict:
+    # writes one JSON line per game to output, as soon as the game is analysed
+    start = time.perf_counter()
+    summary = {"games": 0, "plies": 0, "errors": 0}
+    tasks = (
+        (number, game, depth, nodes, seconds) for number, game in enumerate(games, 1)
+    )
+    for result in boundedMap(analyseGame, tasks, workers):
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        summary["games"] += 1
+        summary["plies"] += len(result["plies"])
+        summary["errors"] += "error" in result
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def main(arguments: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Analyse the games of a PGN file")
+    parser.add_argument("pgn")
+    parser.add_argument("--output", help="JSON lines file, standard output by default")
+    parser.add_argument("--depth", type=int, default=4, help="search depth per ply")
+    parser.add_argument("--nodes", type=int, help="node limit per ply")
+    parser.add_argument("--movetime", type=float, help="seconds per ply")
+    parser.add_argument("--workers", type=int, help="default: one per processor")
+    options = parser.parse_args(arguments)
+
+    output = open(options.output, "w") if options.output else sys.stdout
+    try:
+        summary = analyseGames(
+            readGames(options.pgn),
+            output,
+            min(options.depth, MAX_DEPTH),
+            options.nodes,
+            options.movetime,
+            options.workers,
+        )
+    finally:
+        if options.output:
+            output.close()
+    print(
+        f"{summary['games']} games, {summary['plies']} plies, "
+        f"{summary['errors']} errors in {summary['seconds']:.1f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,44 @@
+import io
+import json
+import unittest
+from Analysis import analyseGames
+from ChessFunctionsAndConstants import MATE_BOUND
+from Pgn import readGames
+
+PGN = """[Event "Blunder"]
+
+1. e4 e5 2. Qh5 Ke7 3. Qxe5# 1-0
+
+[Event "Illegal"]
+
+1. e4 e5 2. Ke3 *
+"""
+
+
+class TestAnalysis(unittest.TestCase):
+    def test_annotates_games(self):
+        output = io.StringIO()
+        summary = analyseGames(readGames(io.StringIO(PGN)), output, 2, workers=1)
+        self.assertEqual(
+            (summary["games"], summary["plies"], summary["errors"]), (2, 5, 1)
+        )
+
+        results = {}
+        for line in output.getvalue().splitlines():
+            result = json.loads(line)
+            results[result["headers"]["Event"]] = result
+        self.assertEqual(results["Illegal"]["error"], "Illegal move: Ke3")
+
+        plies = results["Blunder"]["plies"]
+        self.assertEqual(
+            [ply["move"] for ply in plies], ["e4", "e5", "Qh5", "Ke7", "Qxe5#"]
+        )
+        self.assertTrue(plies[3]["blunder"])
+        self.assertFalse(plies[0]["blunder"])
+        # white mates, so the evaluation after the last move is a mate for white
+        self.assertGreater(plies[4]["eval"], MATE_BOUND)
+        self.assertEqual(plies[4]["best"], "Qxe5#")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,297 @@
+import argparse
+import gc
+import json
+import sys
+import time
+from Board import Board
+from ChessFunctionsAndConstants import WHITE, BLACK
+from San import moveToSan, parseSan
+
+PERFT_POSITIONS = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", 3),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 3),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 4),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 3),
+]
+
+
+def gcCollections() -> list[int]:
+    return [generation["collections"] for generation in gc.get_stats()]
+
+
+SEARCH_POSITIONS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+]
+
+
+def perftBenchmark(positions=PERFT_POSITIONS, copyMake: bool = True) -> dict:
+    board = Board(copyMake)
+    gc.collect()
+
+    collectionsBefore = gcCollections()
+    nodes = 0
+    start = time.perf_counter()
+    for fen, depth in positions:
+        board.setToFen(fen)
+        nodes += board.perft(depth)
+    seconds = time.perf_counter() - start
+    collectionsAfter = gcCollections()
+
+    return {
+        "nodes": nodes,
+        "seconds": seconds,
+        "nps": nodes / seconds,
+        # number of garbage collections run per generation
+        "gcCollections": [
+            after - before for before, after in zip(collectionsBefore, collectionsAfter)
+        ],
+    }
+
+
+def searchBenchmark(
+    positions=SEARCH_POSITIONS, depth: int = 3, copyMake: bool = True, **features
+) -> dict:
+    # features are Board attributes switching selective search on or off,
+    # e.g. useNullMove=False
+    board = Board(copyMake)
+    for feature, enabled in features.items():
+        setattr(board, feature, enabled)
+
+    nodes = 0
+    start = time.perf_counter()
+    for fen in positions:
+        board.setToFen(fen)
+        board.iterativeSearch(depth)
+        nodes += board.nodeCount
+    seconds = time.perf_counter() - start
+
+    return {"depth": depth, "seconds": seconds, "nodes": nodes}
+
+
+SEARCH_FEATURES = [
+    "useNullMove",
+    "useLateMoveReductions",
+    "useFutilityPruning",
+    "useReverseFutilityPruning",
+]
+
+
+def compareMoveModes() -> None:
+    for copyMake in [True, False]:
+        print("copy-make" if copyMake else "make/unmake")
+        result = perftBenchmark(copyMake=copyMake)
+        print(f"perft nodes: {result['nodes']}")
+        print(f"time:        {result['seconds']:.2f}s")
+        print(f"nodes/sec:   {result['nps']:.0f}")
+        print(f"gc runs:     {result['gcCollections']}")
+        result = searchBenchmark(copyMake=copyMake)
+        print(f"search to depth {result['depth']}: {result['seconds']:.2f}s")
+        print()
+
+
+def compareSearchFeatures(depth: int = 4) -> None:
+    # time to depth and nodes with each feature switched off on its own
+    baseline = searchBenchmark(depth=depth)
+    print(f"all features: {baseline['nodes']} nodes, {baseline['seconds']:.2f}s")
+    for feature in SEARCH_FEATURES:
+        result = searchBenchmark(depth=depth, **{feature: False})
+        print(
+            f"without {feature}: {result['nodes']} nodes, {result['seconds']:.2f}s "
+            f"({result['nodes'] / baseline['nodes']:.2f}x nodes)"
+        )
+
+
+# Throughput of every hot path on the positions of PERFT_POSITIONS. Each entry maps
+# a component to a function running it once per position and returning the number
+# of operations done.
+
+
+def benchmarkMoveGeneration(board: Board) -> int:
+    return len(board.generateMoves())
+
+
+def benchmarkLegalMoves(board: Board) -> int:
+    return len(board.legalMoves())
+
+
+def benchmarkMakeUnmake(board: Board) -> int:
+    moves = board.generateMoves()
+    for move in moves:
+        board.make_move(move)
+        board.unmake_move()
+    return len(moves)
+
+
+def benchmarkSquareAttacks(board: Board) -> int:
+    for square in range(64):
+        board.isSquareAttackedBy(square, WHITE)
+        board.isSquareAttackedBy(square, BLACK)
+    return 128
+
+
+def benchmarkEvaluate(board: Board) -> int:
+    board.evaluate()
+    return 1
+
+
+# the SAN of the legal moves by position hash, written on the first repeat so that
+# only parsing is measured after it
+SAN_MOVES = {}
+
+
+def benchmarkParseSan(board: Board) -> int:
+    if board.hash not in SAN_MOVES:
+        SAN_MOVES[board.hash] = [moveToSan(board, move) for move in board.legalMoves()]
+    sans = SAN_MOVES[board.hash]
+    for san in sans:
+        parseSan(board, san)
+    return len(sans)
+
+
+COMPONENTS = {
+    "moveGeneration": (benchmarkMoveGeneration, "moves/s"),
+    "legalMoves": (benchmarkLegalMoves, "moves/s"),
+    "makeUnmake": (benchmarkMakeUnmake, "pairs/s"),
+    "isSquareAttackedBy": (benchmarkSquareAttacks, "calls/s"),
+    "evaluate": (benchmarkEvaluate, "calls/s"),
+    "parseSan": (benchmarkParseSan, "moves/s"),
+}
+
+
+def componentBenchmark(component, repeats: int = 200, rounds: int = 3) -> float:
+    # operations per second, best of several rounds as the machine may be noisy
+    board = Board()
+    best = 0
+    for attempt in range(rounds):
+        operations = 0
+        seconds = 0
+        for fen, depth in PERFT_POSITIONS:
+            board.setToFen(fen)
+            start = time.perf_counter()
+            for repeat in range(repeats):
+                operations += component(board)
+            seconds += time.perf_counter() - start
+        best = max(best, operations / seconds)
+    return best
+
+
+def runSuite(searchDepth: int = 3, rounds: int = 3) -> dict:
+    # every result is a value and whether higher values are better
+    results = {}
+    for name, (component, unit) in COMPONENTS.items():
+        results[name] = {
+            "value": componentBenchmark(component, rounds=rounds),
+            "unit": unit,
+            "higherIsBetter": True,
+        }
+    results["perft"] = {
+        "value": max(perftBenchmark()["nps"] for attempt in range(rounds)),
+        "unit": "nodes/s",
+        "higherIsBetter": True,
+    }
+    results["searchTimeToDepth"] = {
+        "value": min(
+            searchBenchmark(depth=searchDepth)["seconds"] for attempt in range(rounds)
+        ),
+        "unit": f"s to depth {searchDepth}",
+        "higherIsBetter": False,
+    }
+    return results
+
+
+def compareWithBaseline(
+    results: dict, baseline: dict, threshold: float, thresholds: dict = None
+) -> list[str]:
+    # Returns a line for every component that got slower than the baseline by more
+    # than its threshold, in percent
+    if thresholds is None:
+        thresholds = {}
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["value"]
+        after = result["value"]
+        if result["higherIsBetter"]:
+            change = (after - before) / before * 100
+        else:
+            change = (before - after) / before * 100
+        allowed = thresholds.get(name, threshold)
+        if change < -allowed:
+            regressions.append(
+                f"{name}: {before:.6g} -> {after:.6g} {result['unit']} "
+                f"({change:+.1f}%, allowed -{allowed}%)"
+            )
+    return regressions
+
+
+def printResults(results: dict) -> None:
+    for name, result in results.items():
+        print(f"{name:20} {result['value']:14.6g} {result['unit']}")
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Engine throughput benchmarks")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10,
+        help="allowed slowdown against the baseline in percent",
+    )
+    parser.add_argument(
+        "--component-threshold",
+        action="append",
+        default=[],
+        metavar="COMPONENT=PERCENT",
+        help="allowed slowdown for a single component",
+    )
+    parser.add_argument("--search-depth", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--compare-modes",
+        action="store_true",
+        help="compare copy-make with make/unmake",
+    )
+    parser.add_argument(
+        "--compare-features",
+        action="store_true",
+        help="compare search with each selective search feature switched off",
+    )
+    options = parser.parse_args(arguments)
+
+    if options.compare_modes:
+        compareMoveModes()
+        return 0
+    if options.compare_features:
+        compareSearchFeatures()
+        return 0
+
+    results = runSuite(options.search_depth, options.rounds)
+    printResults(results)
+    if options.output:
+        with open(options.output, "w") as outputFile:
+            json.dump(results, outputFile, indent=4)
+
+    if options.baseline:
+        with open(options.baseline) as baselineFile:
+            baseline = json.load(baselineFile)
+        thresholds = {}
+        for componentThreshold in options.component_threshold:
+            name, percent = componentThreshold.split("=")
+            thresholds[name] = float(percent)
+        regressions = compareWithBaseline(
+            results, baseline, options.threshold, thresholds
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,34 @@
+import unittest
+from Benchmark import compareWithBaseline
+
+
+def result(value, higherIsBetter=True):
+    return {"value": value, "unit": "ops/s", "higherIsBetter": higherIsBetter}
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_regressions_respect_thresholds(self):
+        baseline = {
+            "evaluate": result(100),
+            "legalMoves": result(100),
+            "searchTimeToDepth": result(1.0, False),
+        }
+        results = {
+            "evaluate": result(85),
+            "legalMoves": result(95),
+            "searchTimeToDepth": result(1.2, False),
+            "perft": result(1),
+        }
+        regressions = compareWithBaseline(results, baseline, 10)
+        self.assertEqual(
+            [regression.split(":")[0] for regression in regressions],
+            ["evaluate", "searchTimeToDepth"],
+        )
+        regressions = compareWithBaseline(
+            results, baseline, 10, {"evaluate": 20, "searchTimeToDepth": 25}
+        )
+        self.assertEqual(regressions, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import mmap
+import os
+
+from ChessFunctionsAndConstants import *
+
+# Bitbase for king and pawn versus king: one bit per position telling whether the
+# side with the pawn wins. It is built once by retrograde analysis, stored next to
+# this module and memory mapped afterwards.
+# Reference: https://www.chessprogramming.org/KPK
+#
+# Positions are normalized so that the pawn is white and on the a-d files, by
+# mirroring the board vertically and swapping the colors when black has the pawn,
+# and horizontally when the pawn is on the e-h files. The index of a normalized
+# position is then computed directly from its squares:
+#   ((pawn * 64 + white king) * 64 + black king) * 2 + white to move
+# where pawn counts the 24 squares a7-d2 of the a-d files.
+
+KPK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kpk.bitbase")
+KPK_POSITIONS = 24 * 64 * 64 * 2
+
+INVALID = 0
+UNKNOWN = 1
+DRAW = 2
+WIN = 3
+
+
+def kpkIndex(whiteToMove: bool, whiteKing: int, blackKing: int, pawn: int) -> int:
+    pawnIndex = (pawn % 8) * 6 + (pawn // 8) - 1
+    return ((pawnIndex * 64 + whiteKing) * 64 + blackKing) * 2 + whiteToMove
+
+
+def squaresOf(bitboard: uint64) -> list[int]:
+    return [square for square in range(64) if getBit(bitboard, square)]
+
+
+def generateKPK(pct) -> bytes:
+    # Every position is first classified on its own, then the others are resolved
+    # from their successors until nothing changes: white wins if one of its moves
+    # wins, black draws if one of its moves draws. Whatever is left is a draw.
+    kingMoves = [set(squaresOf(pct.kingAttackTable[square])) for square in range(64)]
+    pawnAttacks = [
+        set(squaresOf(pct.pawnAttackTable[WHITE][square])) for square in range(64)
+    ]
+
+    results = [INVALID] * KPK_POSITIONS
+    successors = [None] * KPK_POSITIONS
+    for pawnFile in range(4):
+        for pawnRow in range(1, 7):
+            pawn = pawnRow * 8 + pawnFile
+            for whiteKing in range(64):
+                for blackKing in range(64):
+                    if (
+                        whiteKing == pawn
+                        or blackKing == pawn
+                        or whiteKing == blackKing
+                        or blackKing in kingMoves[whiteKing]
+                    ):
+                        continue
+                    for whiteToMove in (True, False):
+                        index = kpkIndex(whiteToMove, whiteKing, blackKing, pawn)
+                        if whiteToMove:
+                            results[index], successors[index] = classifyWhiteToMove(
+                                whiteKing, blackKing, pawn, kingMoves, pawnAttacks
+                            )
+                        else:
+                            results[index], successors[index] = classifyBlackToMove(
+                                whiteKing, blackKing, pawn, kingMoves, pawnAttacks
+                            )
+
+    unknown = [index for index in range(KPK_POSITIONS) if results[index] == UNKNOWN]
+    changed = True
+    while changed:
+        changed = False
+        stillUnknown = []
+        for index in unknown:
+            successorResults = [results[successor] for successor in successors[index]]
+            if index & 1:
+                if WIN in successorResults:
+                    results[index] = WIN
+                elif all(result == DRAW for result in successorResults):
+                    results[index] = DRAW
+            else:
+                if DRAW in successorResults:
+                    results[index] = DRAW
+                elif all(result == WIN for result in successorResults):
+                    results[index] = WIN
+
+            if results[index] == UNKNOWN:
+                stillUnknown.append(index)
+            else:
+                changed = True
+        unknown = stillUnknown
+
+    bits = bytearray(KPK_POSITIONS // 8)
+    for index, result in enumerate(results):
+        if result == WIN:
+            bits[index >> 3] |= 1 << (index & 7)
+    return bytes(bits)
+
+
+def classifyWhiteToMove(whiteKing, blackKing, pawn, kingMoves, pawnAttacks):
+    if blackKing in pawnAttacks[pawn]:
+        # black is in check with white to move
+        return INVALID, None
+
+    # the pawn promotes unless the black king can take the new queen
+    push = pawn - 8
+    if pawn < 16 and push != whiteKing and push != blackKing:
+        if push not in kingMoves[blackKing] or push in kingMoves[whiteKing]:
+            return WIN, None
+
+    successors = []
+    for square in kingMoves[whiteKing]:
+        if square != pawn and square not in kingMoves[blackKing]:
+            successors.append(kpkIndex(False, square, blackKing, pawn))
+    if pawn >= 16 and push != whiteKing and push != blackKing:
+        successors.append(kpkIndex(False, whiteKing, blackKing, push))
+        doublePush = push - 8
+        if pawn >= 48 and doublePush != whiteKing and doublePush != blackKing:
+            successors.append(kpkIndex(False, whiteKing, blackKing, doublePush))
+
+    return (UNKNOWN if successors else DRAW), successors
+
+
+def classifyBlackToMove(whiteKing, blackKing, pawn, kingMoves, pawnAttacks):
+    successors = []
+    for square in kingMoves[blackKing]:
+        if square in kingMoves[whiteKing] or square in pawnAttacks[pawn]:
+            continue
+        if square == pawn:
+            # the pawn is undefended and can be taken
+            return DRAW, None
+        successors.append(kpkIndex(True, whiteKing, square, pawn))
+
+    if not successors:
+        # checkmate or stalemate
+        return (WIN if blackKing in pawnAttacks[pawn] else DRAW), None
+    return UNKNOWN, successors
+
+
+KPK_BITBASE = None
+
+
+def loadKPK(pct) -> mmap.mmap:
+    # the bitbase is generated on first use, like the generated move generators
+    global KPK_BITBASE
+    if KPK_BITBASE is not None:
+        return KPK_BITBASE
+
+    if not os.path.exists(KPK_PATH):
+        temporaryPath = f"{KPK_PATH}.{os.getpid()}.tmp"
+        with open(temporaryPath, "wb") as temporaryFile:
+            temporaryFile.write(generateKPK(pct))
+        os.replace(temporaryPath, KPK_PATH)
+
+    with open(KPK_PATH, "rb") as bitbaseFile:
+        KPK_BITBASE = mmap.mmap(bitbaseFile.fileno(), 0, access=mmap.ACCESS_READ)
+    return KPK_BITBASE
+
+
+def probeKPK(bitbase, board) -> bool:
+    # whether the side with the pawn wins, the board must hold only two kings and
+    # one pawn
+    whitePawns = board.bitboards[WHITE | PAWN]
+    strongSide = WHITE if whitePawns else BLACK
+    weakSide = (BLACK + WHITE) - strongSide
+    pawn = 63 - getLSBIndex(board.bitboards[strongSide | PAWN])
+    strongKing = 63 - getLSBIndex(board.bitboards[strongSide | KING])
+    weakKing = 63 - getLSBIndex(board.bitboards[weakSide | KING])
+
+    if strongSide == BLACK:
+        pawn ^= 56
+        strongKing ^= 56
+        weakKing ^= 56
+    if pawn % 8 > 3:
+        pawn ^= 7
+        strongKing ^= 7
+        weakKing ^= 7
+
+    index = kpkIndex(board.currentTurn == strongSide, strongKing, weakKing, pawn)
+    return bool(bitbase[index >> 3] & (1 << (index & 7)))
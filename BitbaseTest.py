@@ -0,0 +1,73 @@
+import random
+import unittest
+from Board import Board
+from ChessFunctionsAndConstants import WHITE
+
+# (fen, whether the side with the pawn wins)
+KNOWN_POSITIONS = [
+    ("4k3/8/4K3/4P3/8/8/8/8 w - - 0 1", True),
+    ("4k3/8/4K3/4P3/8/8/8/8 b - - 0 1", True),
+    ("4k3/8/8/8/8/8/4P3/4K3 w - - 0 1", True),
+    ("4k3/8/8/8/8/8/4P3/4K3 b - - 0 1", False),
+    ("k7/8/8/8/8/8/P7/K7 b - - 0 1", False),
+    ("k7/8/K7/P7/8/8/8/8 w - - 0 1", False),
+    ("8/8/P7/8/8/8/k7/7K w - - 0 1", True),
+    # colors and files mirrored
+    ("8/8/8/8/4p3/4k3/8/4K3 w - - 0 1", True),
+    ("3k4/8/8/8/8/8/3P4/3K4 b - - 0 1", False),
+    ("7k/8/7K/7P/8/8/8/8 w - - 0 1", False),
+]
+
+
+def randomKPKFen(generator: random.Random) -> str:
+    squares = generator.sample(range(64), 3)
+    while not 8 <= squares[2] < 56:
+        squares = generator.sample(range(64), 3)
+    board = ["1"] * 64
+    for square, piece in zip(squares, "KkP"):
+        board[square] = piece
+    rows = ["".join(board[row * 8 : row * 8 + 8]) for row in range(8)]
+    turn = generator.choice("wb")
+    return "/".join(rows) + f" {turn} - - 0 1"
+
+
+class TestBitbase(unittest.TestCase):
+    def test_known_positions(self):
+        board = Board()
+        for fen, wins in KNOWN_POSITIONS:
+            board.setToFen(fen)
+            self.assertTrue(board.isKPK())
+            self.assertEqual(board.isBitbaseDraw(), not wins, fen)
+
+    def test_agrees_with_move_generator(self):
+        # a won position for the side with the pawn has a winning move, a drawn one
+        # has no winning move; for the other side it is the other way around
+        board = Board()
+        generator = random.Random(38)
+        checked = 0
+        while checked < 150:
+            board.setToFen(randomKPKFen(generator))
+            if board.kingCanBeCaptured():
+                continue
+            moves = board.legalMoves()
+            if not moves or any(
+                move.isPromotion() or move.isMoveCapture() for move in moves
+            ):
+                continue
+
+            strongToMove = board.currentTurn == WHITE
+            wins = not board.isBitbaseDraw()
+            childWins = []
+            for move in moves:
+                board.make_move(move)
+                childWins.append(not board.isBitbaseDraw())
+                board.unmake_move()
+            if strongToMove:
+                self.assertEqual(wins, any(childWins))
+            else:
+                self.assertEqual(wins, all(childWins))
+            checked += 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,17 +2,20 @@ from ChessFunctionsAndConstants import *
 from PreComputedTables import PreComputedTables
 import pickle
 from Move import Move
+from MoveGenerator import MOVE_GENERATORS, CAPTURE_GENERATORS, QUIET_GENERATORS
+from Bitbase import loadKPK, probeKPK
+from SearchStats import SearchStats, stripStatistics
 
 
 class Board:
-    def __init__(self) -> None:
+    def __init__(self, copyMake: bool = True) -> None:
         # there are 23 bitboards though only 12 are needed.
         # this is because I want the index of the bitboard
         # to be the same as the integer representation of the piece
 
         self.board = [EMPTY] * 64
         self.bitboards = [uint64(0)] * 23
-        self.castlingRights = []
+        self.castlingRights = 0
         self.previousMoves = []
         self.halfMoveCounter = 0
         self.fullMoveCounter = 0
@@ -23,15 +26,50 @@ class Board:
         self.castlingRightsStack = []
         self.halfMoveCounterStack = []
         self.moveStack = []
+        self.hashStack = []
+        self.hash = 0
+
+        # copy-make keeps one preallocated position slot and mailbox per ply instead of
+        # undoing moves, see copyPosition
+        self.copyMake = copyMake
+        self.positionStack = [[uint64(0)] * POSITION_SIZE for ply in range(MAX_PLY)]
+        self.mailboxStack = [[EMPTY] * 64 for ply in range(MAX_PLY)]
+        self.positionIndex = 0
 
         self.bestMove = None
-        self.evaluatedCount = 0
+        self.nodeCount = 0
+        self.stats = SearchStats()
+        self.statsEnabled = False
+
+        # Set from another thread to abort a running search, or by the search itself
+        # once nodeLimit nodes were visited. Whoever starts a search clears it.
+        self.stopSearch = False
+        self.nodeLimit = INFINITY
+
+        # selective search features, can be switched off to measure their effect
+        self.useNullMove = True
+        self.useLateMoveReductions = True
+        self.useFutilityPruning = True
+        self.useReverseFutilityPruning = True
+        self.transpositionTable = {}
+        self.pvTable = [[None] * (MAX_PLY + 1) for ply in range(MAX_PLY + 1)]
+        self.pvLength = [0] * (MAX_PLY + 1)
+        self.principalVariation = []
+        self.excludedRootMoves = set()
+        self.killerMoves = [[None, None] for ply in range(MAX_PLY)]
+
+        # Moves are generated into one preallocated buffer instead of fresh lists.
+        # Every ply owns the MAX_MOVES slots starting at ply * MAX_MOVES, the last
+        # slot is scratch space for generateMoves.
+        self.moveBuffer = [None] * ((MAX_PLY + 1) * MAX_MOVES)
+        self.moveScores = [0] * ((MAX_PLY + 1) * MAX_MOVES)
 
         try:
             self.pct: PreComputedTables = pickle.load(open("pctobject", "rb"))
         except FileNotFoundError:
             self.pct = PreComputedTables()
             pickle.dump(self.pct, open("pctobject", "wb"))
+        self.kpkBitbase = loadKPK(self.pct)
 
         self.setToFen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
 
@@ -54,7 +92,7 @@ class Board:
                 else "-"
             )
         )
-        print(f"Castling rights: {self.castlingRights}")
+        print(f"Castling rights: {castlingRightsToString(self.castlingRights)}")
         print(f"Halfmove counter: {self.halfMoveCounter}")
         print(f"Fullmove counter: {self.fullMoveCounter}")
         print(f"To move: {'white' if self.currentTurn == WHITE else 'black'}")
@@ -89,12 +127,10 @@ class Board:
         else:
             self.currentTurn = BLACK
 
-        self.castlingRights = [
-            "K" in castlingRights,
-            "Q" in castlingRights,
-            "k" in castlingRights,
-            "q" in castlingRights,
-        ]
+        self.castlingRights = 0
+        for right, mask in [("K", WKMASK), ("Q", WQMASK), ("k", BKMASK), ("q", BQMASK)]:
+            if right in castlingRights:
+                self.castlingRights |= mask
 
         if enPassant == "-":
             self.enPassantSquare = None
@@ -107,6 +143,76 @@ class Board:
 
         self.updateBitBoards()
 
+        self.hash = self.computeHash()
+        self.resetStacks()
+
+    def getFen(self) -> str:
+        rows = []
+        for rank in range(8):
+            row = ""
+            emptySquares = 0
+            for piece in self.board[rank * 8 : rank * 8 + 8]:
+                if piece == EMPTY:
+                    emptySquares += 1
+                    continue
+                if emptySquares:
+                    row += str(emptySquares)
+                    emptySquares = 0
+                row += pieceToCharacter(piece)
+            if emptySquares:
+                row += str(emptySquares)
+            rows.append(row)
+
+        if self.enPassantSquare is None:
+            enPassant = "-"
+        else:
+            enPassant = squareIndexToSquareName(self.enPassantSquare)
+
+        return " ".join(
+            [
+                "/".join(rows),
+                "w" if self.currentTurn == WHITE else "b",
+                castlingRightsToString(self.castlingRights),
+                enPassant,
+                str(self.halfMoveCounter),
+                str(self.fullMoveCounter),
+            ]
+        )
+
+    def resetStacks(self) -> None:
+        self.enPassantStack = []
+        self.castlingRightsStack = []
+        self.halfMoveCounterStack = []
+        self.moveStack = []
+        self.hashStack = []
+
+        # the position becomes the first copy-make slot
+        self.positionIndex = 0
+        position = self.positionStack[0]
+        position[:23] = self.bitboards
+        self.bitboards = position
+        mailbox = self.mailboxStack[0]
+        mailbox[:] = self.board
+        self.board = mailbox
+
+    def computeHash(self) -> int:
+        # Reference: https://www.chessprogramming.org/Zobrist_Hashing
+        positionHash = 0
+        for square in range(64):
+            piece = self.board[square]
+            if piece != EMPTY:
+                positionHash ^= ZOBRIST_PIECE_KEYS[piece][square]
+
+        if self.currentTurn == BLACK:
+            positionHash ^= ZOBRIST_SIDE_KEY
+
+        positionHash ^= ZOBRIST_CASTLING_MASK_KEYS[self.castlingRights]
+
+        if self.enPassantSquare is not None:
+            positionHash ^= ZOBRIST_EN_PASSANT_KEYS[self.enPassantSquare]
+
+        return positionHash
+
     def updateBitBoards(self) -> None:
         self.bitboards = [uint64(0)] * 23
         for squareIndex in range(64):
@@ -156,588 +262,56 @@ class Board:
 
         return False
 
-    def generateMoves(self) -> list[Move]:
-        move_list = []
-        move_list_count = 0
-
-        for piece in ALL_PIECES:
-            bitboard = self.bitboards[piece]
-
-            if not bitboard:
-                continue
-
-            # Generate pawn white moves
-            if self.currentTurn == WHITE:
-                if piece == WHITE | PAWN:
-                    while bitboard:
-                        source_square = 63 - getLSBIndex(bitboard)
-                        target_square = source_square - 8
-
-                        if not (
-                            target_square < 0
-                            or target_square > 63
-                            or getBit(self.bitboards[ALL], target_square)
-                        ):
-                            # Promoting push
-                            if source_square > 7 and source_square < 16:
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.nPromo,
-                                        piece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.bPromo,
-                                        piece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.rPromo,
-                                        piece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.qPromo,
-                                        piece,
-                                    )
-                                )
-
-                            else:
-                                # Normal push
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.quietMove,
-                                        piece,
-                                    )
-                                )
-                                # Double push
-                                if source_square > 47 and source_square < 56:
-                                    target_square = target_square - 8
-                                    if not getBit(self.bitboards[ALL], target_square):
-                                        move_list.append(
-                                            Move(
-                                                source_square,
-                                                target_square,
-                                                Move.doublePawnPush,
-                                                piece,
-                                            )
-                                        )
-
-                        attacks = self.pct.pawnAttackTable[WHITE][source_square]
-                        attacks &= self.bitboards[BLACK]
-
-                        while attacks:
-                            target_square = 63 - getLSBIndex(attacks)
-                            targetPiece = self.board[target_square]
-
-                            # Promoting capture
-                            if source_square > 7 and source_square < 16:
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.nPromoCapture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.bPromoCapture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.rPromoCapture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.qPromoCapture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-
-                            # Normal capture
-                            else:
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.capture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-
-                            attacks = popLSB(attacks)
-
-                        # En Passant Capture
-                        if self.enPassantSquare:
-                            enPassantAttacks = self.pct.pawnAttackTable[WHITE][
-                                source_square
-                            ] & setBit(uint64(0), self.enPassantSquare)
-                            while enPassantAttacks:
-                                target_square = 63 - getLSBIndex(enPassantAttacks)
-                                targetPiece = BLACK | PAWN
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.epCapture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-                                enPassantAttacks = popLSB(enPassantAttacks)
-                        bitboard = popLSB(bitboard)
-
-                # Castling
-                elif piece == WHITE | KING:
-                    # Check kingside castling if relevant squares and empty and rights are still True
-                    if self.castlingRights[WKINDEX] and not (
-                        self.bitboards[ALL] & WKEMPTYBB
-                    ):
-                        # ensure squares are not under attack:
-                        canCastle = True
-                        for square in WKATTACKSQUARES:
-                            if self.isSquareAttackedBy(square, BLACK):
-                                canCastle = False
-                                break
-
-                        # Generate move if castle is legal
-                        if canCastle:
-                            move_list.append(
-                                Move(
-                                    squareNameToIndex("e1"),
-                                    squareNameToIndex("g1"),
-                                    Move.kingCastle,
-                                    piece,
-                                )
-                            )
-
-                    # Check queenside castling if relevant squares and empty and rights are still True
-                    if self.castlingRights[WQINDEX] and not (
-                        self.bitboards[ALL] & WQEMPTYBB
-                    ):
-                        # ensure squares are not under attack:
-                        canCastle = True
-                        for square in WQATTACKSQUARES:
-                            if self.isSquareAttackedBy(square, BLACK):
-                                canCastle = False
-                                break
-
-                        if canCastle:
-                            move_list.append(
-                                Move(
-                                    squareNameToIndex("e1"),
-                                    squareNameToIndex("c1"),
-                                    Move.queenCastle,
-                                    piece,
-                                )
-                            )
-
-            # Generate black pawn moves
-            elif self.currentTurn == BLACK:
-                if piece == BLACK | PAWN:
-                    while bitboard:
-                        source_square = 63 - getLSBIndex(bitboard)
-                        target_square = source_square + 8
-
-                        if not (
-                            target_square < 0
-                            or target_square > 63
-                            or getBit(self.bitboards[ALL], target_square)
-                        ):
-                            # Promoting push
-                            if source_square > 47 and source_square < 56:
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.nPromo,
-                                        piece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.bPromo,
-                                        piece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.rPromo,
-                                        piece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.qPromo,
-                                        piece,
-                                    )
-                                )
-                            else:
-                                # Normal push
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.quietMove,
-                                        piece,
-                                    )
-                                )
-                                # Double push
-                                if source_square > 7 and source_square < 16:
-                                    target_square = target_square + 8
-                                    if not getBit(self.bitboards[ALL], target_square):
-                                        move_list.append(
-                                            Move(
-                                                source_square,
-                                                target_square,
-                                                Move.doublePawnPush,
-                                                piece,
-                                            )
-                                        )
-
-                        attacks = self.pct.pawnAttackTable[BLACK][source_square]
-                        attacks &= self.bitboards[WHITE]
-
-                        while attacks:
-                            target_square = 63 - getLSBIndex(attacks)
-                            targetPiece = self.board[target_square]
-
-                            # Promoting capture
-                            if source_square > 47 and source_square < 56:
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.nPromoCapture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.bPromoCapture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.rPromoCapture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.qPromoCapture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-
-                            # Normal capture
-                            else:
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.capture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-
-                            attacks = popLSB(attacks)
-
-                        # En Passant attacks:
-                        if self.enPassantSquare:
-                            enPassantAttacks = self.pct.pawnAttackTable[BLACK][
-                                source_square
-                            ] & setBit(uint64(0), self.enPassantSquare)
-                            while enPassantAttacks:
-                                target_square = 63 - getLSBIndex(enPassantAttacks)
-                                targetPiece = WHITE | PAWN
-                                move_list.append(
-                                    Move(
-                                        source_square,
-                                        target_square,
-                                        Move.epCapture,
-                                        piece,
-                                        targetPiece,
-                                    )
-                                )
-                                enPassantAttacks = popLSB(enPassantAttacks)
-
-                        bitboard = popLSB(bitboard)
-
-                # Castling
-                elif piece == BLACK | KING:
-                    # Check kingside castling if relevant squares and empty and rights are still True
-                    if self.castlingRights[BKINDEX] and not (
-                        self.bitboards[ALL] & BKEMPTYBB
-                    ):
-                        # ensure squares are not under attack:
-                        canCastle = True
-                        for square in BKATTACKSQUARES:
-                            if self.isSquareAttackedBy(square, WHITE):
-                                canCastle = False
-                                break
-
-                        # Generate move if castle is legal
-                        if canCastle:
-                            move_list.append(
-                                Move(
-                                    squareNameToIndex("e8"),
-                                    squareNameToIndex("g8"),
-                                    Move.kingCastle,
-                                    piece,
-                                )
-                            )
-
-                    # Check kingside castling if relevant squares and empty and rights are still True
-                    if self.castlingRights[BQINDEX] and not (
-                        self.bitboards[ALL] & BQEMPTYBB
-                    ):
-                        # ensure squares are not under attack:
-                        canCastle = True
-                        for square in BQATTACKSQUARES:
-                            if self.isSquareAttackedBy(square, WHITE):
-                                canCastle = False
-                                break
-
-                        if canCastle:
-                            move_list.append(
-                                Move(
-                                    squareNameToIndex("e8"),
-                                    squareNameToIndex("c8"),
-                                    Move.queenCastle,
-                                    piece,
-                                )
-                            )
-
-            if piece == self.currentTurn | KNIGHT:
-                while bitboard:
-                    source_square = 63 - getLSBIndex(bitboard)
-
-                    attacks = self.pct.knightAttackTable[source_square] & ~(
-                        self.bitboards[self.currentTurn]
-                    )
-
-                    while attacks:
-                        target_square = 63 - getLSBIndex(attacks)
-
-                        # Capture moves: The moves were filtered not to include same side piece captures
-                        # so if the bit of the target square in all occupancies bitboard is set to one
-                        # it is an opponent capture
-                        if getBit(self.bitboards[ALL], target_square):
-                            targetPiece = self.board[target_square]
-                            move_list.append(
-                                Move(
-                                    source_square,
-                                    target_square,
-                                    Move.capture,
-                                    piece,
-                                    targetPiece,
-                                )
-                            )
-                        else:
-                            move_list.append(
-                                Move(
-                                    source_square, target_square, Move.quietMove, piece
-                                )
-                            )
-
-                        attacks = popLSB(attacks)
-
-                    bitboard = popLSB(bitboard)
-
-            if piece == self.currentTurn | BISHOP:
-                while bitboard:
-                    source_square = 63 - getLSBIndex(bitboard)
-
-                    attacks = self.pct.getBishopAttacks(
-                        source_square, self.bitboards[ALL]
-                    ) & ~(self.bitboards[self.currentTurn])
-
-                    while attacks:
-                        target_square = 63 - getLSBIndex(attacks)
-
-                        if getBit(self.bitboards[ALL], target_square):
-                            targetPiece = self.board[target_square]
-                            move_list.append(
-                                Move(
-                                    source_square,
-                                    target_square,
-                                    Move.capture,
-                                    piece,
-                                    targetPiece,
-                                )
-                            )
-                        else:
-                            move_list.append(
-                                Move(
-                                    source_square, target_square, Move.quietMove, piece
-                                )
-                            )
-
-                        attacks = popLSB(attacks)
-
-                    bitboard = popLSB(bitboard)
-
-            if piece == self.currentTurn | ROOK:
-                while bitboard:
-                    source_square = 63 - getLSBIndex(bitboard)
-
-                    attacks = self.pct.getRookAttacks(
-                        source_square, self.bitboards[ALL]
-                    ) & ~(self.bitboards[self.currentTurn])
-
-                    while attacks:
-                        target_square = 63 - getLSBIndex(attacks)
-
-                        if getBit(self.bitboards[ALL], target_square):
-                            targetPiece = self.board[target_square]
-                            move_list.append(
-                                Move(
-                                    source_square,
-                                    target_square,
-                                    Move.capture,
-                                    piece,
-                                    targetPiece,
-                                )
-                            )
-                        else:
-                            move_list.append(
-                                Move(
-                                    source_square, target_square, Move.quietMove, piece
-                                )
-                            )
-
-                        attacks = popLSB(attacks)
-
-                    bitboard = popLSB(bitboard)
-
-            if piece == self.currentTurn | QUEEN:
-                while bitboard:
-                    source_square = 63 - getLSBIndex(bitboard)
-
-                    attacks = self.pct.getQueenAttacks(
-                        source_square, self.bitboards[ALL]
-                    ) & ~(self.bitboards[self.currentTurn])
-
-                    while attacks:
-                        target_square = 63 - getLSBIndex(attacks)
-
-                        if getBit(self.bitboards[ALL], target_square):
-                            targetPiece = self.board[target_square]
-                            move_list.append(
-                                Move(
-                                    source_square,
-                                    target_square,
-                                    Move.capture,
-                                    piece,
-                                    targetPiece,
-                                )
-                            )
-                        else:
-                            move_list.append(
-                                Move(
-                                    source_square, target_square, Move.quietMove, piece
-                                )
-                            )
-
-                        attacks = popLSB(attacks)
-
-                    bitboard = popLSB(bitboard)
-
-            if piece == self.currentTurn | KING:
-                while bitboard:
-                    source_square = 63 - getLSBIndex(bitboard)
-
-                    attacks = self.pct.kingAttackTable[source_square] & ~(
-                        self.bitboards[self.currentTurn]
-                    )
+    def attackersOf(self, square: int, bySide: int) -> uint64:
+        # all pieces of bySide attacking the square, used to tell checks apart
+        otherSide = (BLACK + WHITE) - bySide
+        occupied = self.bitboards[ALL]
+        pawns = self.bitboards[bySide | PAWN]
+        bishopsQueens = self.bitboards[bySide | QUEEN] | self.bitboards[bySide | BISHOP]
+        rooksQueens = self.bitboards[bySide | QUEEN] | self.bitboards[bySide | ROOK]
+        return (
+            (self.pct.pawnAttackTable[otherSide][square] & pawns)
+            | (self.pct.knightAttackTable[square] & self.bitboards[bySide | KNIGHT])
+            | (self.pct.kingAttackTable[square] & self.bitboards[bySide | KING])
+            | (self.pct.getBishopAttacks(square, occupied) & bishopsQueens)
+            | (self.pct.getRookAttacks(square, occupied) & rooksQueens)
+        )
 
-                    while attacks:
-                        target_square = 63 - getLSBIndex(attacks)
-
-                        if getBit(self.bitboards[ALL], target_square):
-                            targetPiece = self.board[target_square]
-                            move_list.append(
-                                Move(
-                                    source_square,
-                                    target_square,
-                                    Move.capture,
-                                    piece,
-                                    targetPiece,
-                                )
-                            )
-                        else:
-                            move_list.append(
-                                Move(
-                                    source_square, target_square, Move.quietMove, piece
-                                )
-                            )
-
-                        attacks = popLSB(attacks)
-
-                    bitboard = popLSB(bitboard)
-        return move_list
+    def generateMoves(self) -> list[Move]:
+        # The generators are specialized per side, see MoveGenerator.py
+        start = MAX_PLY * MAX_MOVES
+        end = MOVE_GENERATORS[self.currentTurn](self, self.moveBuffer, start)
+        return self.moveBuffer[start:end]
+
+    def parseMove(self, moveString: str) -> Move:
+        # moves are written in long algebraic notation as used by UCI, e.g. e7e8q
+        for move in self.legalMoves():
+            if str(move) == moveString:
+                return move
+        raise ValueError(f"Illegal move: {moveString}")
 
     def make_move(self, move: Move):
         start_square = move.start
         end_square = move.end
         piece = move.movingPiece
         capturedPiece = move.capturedPiece
+        previousEnPassantSquare = self.enPassantSquare
+        previousCastlingRights = self.castlingRights
+
+        if self.copyMake:
+            self.copyPosition()
+        else:
+            self.enPassantStack.append(self.enPassantSquare)
+            self.castlingRightsStack.append(self.castlingRights)
+            self.halfMoveCounterStack.append(self.halfMoveCounter)
+        self.hashStack.append(self.hash)
+        self.moveStack.append(move)
 
         self.bitboards[piece] = setBit(self.bitboards[piece], end_square)
         self.board[start_square] = EMPTY
         self.bitboards[piece] = clearBit(self.bitboards[piece], start_square)
         self.board[end_square] = piece
 
-        self.enPassantStack.append(self.enPassantSquare)
-
         if move.isDoublePush():
             offset = 8 if self.currentTurn == WHITE else -8
             self.enPassantSquare = end_square + offset
@@ -766,65 +340,37 @@ class Board:
             self.board[end_square] = promotedPiece
 
         if move.isCastling():
-            if self.currentTurn == WHITE:
-                rook = WHITE | ROOK
-                if move.flag == Move.kingCastle:
-                    rookStart = squareNameToIndex("h1")
-                    rookEnd = squareNameToIndex("f1")
-                else:
-                    rookStart = squareNameToIndex("a1")
-                    rookEnd = squareNameToIndex("d1")
-                self.bitboards[rook] = clearBit(self.bitboards[rook], rookStart)
-                self.bitboards[rook] = setBit(self.bitboards[rook], rookEnd)
-                self.board[rookStart] = EMPTY
-                self.board[rookEnd] = rook
-
-            if self.currentTurn == BLACK:
-                rook = BLACK | ROOK
-                if move.flag == Move.kingCastle:
-                    rookStart = squareNameToIndex("h8")
-                    rookEnd = squareNameToIndex("f8")
-                else:
-                    rookStart = squareNameToIndex("a8")
-                    rookEnd = squareNameToIndex("d8")
-                self.bitboards[rook] = clearBit(self.bitboards[rook], rookStart)
-                self.bitboards[rook] = setBit(self.bitboards[rook], rookEnd)
-                self.board[rookStart] = EMPTY
-                self.board[rookEnd] = rook
-
-        self.castlingRightsStack.append([right for right in self.castlingRights])
-
-        if findPieceType(move.movingPiece) == KING:
-            if self.currentTurn == WHITE:
-                self.castlingRights[0] = False
-                self.castlingRights[1] = False
-            elif self.currentTurn == BLACK:
-                self.castlingRights[2] = False
-                self.castlingRights[3] = False
-
-        if findPieceType(move.movingPiece) == ROOK:
-            if start_square == squareNameToIndex("h1"):
-                self.castlingRights[0] = False
-            elif start_square == squareNameToIndex("a1"):
-                self.castlingRights[1] = False
-            elif start_square == squareNameToIndex("h8"):
-                self.castlingRights[2] = False
-            elif start_square == squareNameToIndex("a8"):
-                self.castlingRights[3] = False
-
-        if findPieceType(move.capturedPiece) == ROOK:
-            if end_square == squareNameToIndex("h1"):
-                self.castlingRights[0] = False
-            elif end_square == squareNameToIndex("a1"):
-                self.castlingRights[1] = False
-            elif end_square == squareNameToIndex("h8"):
-                self.castlingRights[2] = False
-            elif end_square == squareNameToIndex("a8"):
-                self.castlingRights[3]
+            rook, rookStart, rookEnd = self.castlingRookMove(move)
+            self.bitboards[rook] = clearBit(self.bitboards[rook], rookStart)
+            self.bitboards[rook] = setBit(self.bitboards[rook], rookEnd)
+            self.board[rookStart] = EMPTY
+            self.board[rookEnd] = rook
+
+        self.castlingRights &= (
+            CASTLING_RIGHTS_KEPT[start_square] & CASTLING_RIGHTS_KEPT[end_square]
+        )
+
+        # Incrementally update the zobrist hash of the position
+        positionHash = self.hash ^ ZOBRIST_SIDE_KEY
+        positionHash ^= ZOBRIST_PIECE_KEYS[piece][start_square]
+        positionHash ^= ZOBRIST_PIECE_KEYS[self.board[end_square]][end_square]
+        if move.isEnPassant():
+            positionHash ^= ZOBRIST_PIECE_KEYS[capturedPiece][end_square + offshift]
+        elif move.isMoveCapture():
+            positionHash ^= ZOBRIST_PIECE_KEYS[capturedPiece][end_square]
+        if move.isCastling():
+            positionHash ^= ZOBRIST_PIECE_KEYS[rook][rookStart]
+            positionHash ^= ZOBRIST_PIECE_KEYS[rook][rookEnd]
+        if previousEnPassantSquare is not None:
+            positionHash ^= ZOBRIST_EN_PASSANT_KEYS[previousEnPassantSquare]
+        if self.enPassantSquare is not None:
+            positionHash ^= ZOBRIST_EN_PASSANT_KEYS[self.enPassantSquare]
+        positionHash ^= ZOBRIST_CASTLING_MASK_KEYS[previousCastlingRights]
+        positionHash ^= ZOBRIST_CASTLING_MASK_KEYS[self.castlingRights]
+        self.hash = positionHash
 
         self.updateOccupancyBitBoards()
 
-        self.halfMoveCounterStack.append(self.halfMoveCounter)
         if findPieceType(move.movingPiece) == PAWN or move.isMoveCapture():
             self.halfMoveCounter = 0
         else:
@@ -835,10 +381,60 @@ class Board:
 
         self.currentTurn = (BLACK + WHITE) - self.currentTurn
 
-        self.moveStack.append(move)
+    def castlingRookMove(self, move: Move) -> tuple[int, int, int]:
+        if findPieceColor(move.movingPiece) == WHITE:
+            if move.flag == Move.kingCastle:
+                return WHITE | ROOK, squareNameToIndex("h1"), squareNameToIndex("f1")
+            return WHITE | ROOK, squareNameToIndex("a1"), squareNameToIndex("d1")
+        if move.flag == Move.kingCastle:
+            return BLACK | ROOK, squareNameToIndex("h8"), squareNameToIndex("f8")
+        return BLACK | ROOK, squareNameToIndex("a8"), squareNameToIndex("d8")
+
+    def copyPosition(self) -> None:
+        # Copy-make: the state of the current position is written into its slot and
+        # play continues on a copy in the next slot, so unmaking a move only has to
+        # step back to the previous slot
+        # Reference: https://www.chessprogramming.org/Copy-Make
+        position = self.bitboards
+        position[TURN_SLOT] = self.currentTurn
+        position[CASTLING_SLOT] = self.castlingRights
+        position[EN_PASSANT_SLOT] = self.enPassantSquare
+        position[HALF_MOVE_SLOT] = self.halfMoveCounter
+        position[FULL_MOVE_SLOT] = self.fullMoveCounter
+
+        self.positionIndex += 1
+        if self.positionIndex == len(self.positionStack):
+            # games can outgrow the preallocated slots
+            self.positionStack.append([uint64(0)] * POSITION_SIZE)
+            self.mailboxStack.append([EMPTY] * 64)
+
+        nextPosition = self.positionStack[self.positionIndex]
+        nextPosition[:] = position
+        self.bitboards = nextPosition
+
+        nextMailbox = self.mailboxStack[self.positionIndex]
+        nextMailbox[:] = self.board
+        self.board = nextMailbox
+
+    def restorePosition(self) -> None:
+        # Copy-make undo: step back to the slot of the previous position
+        self.positionIndex -= 1
+        position = self.positionStack[self.positionIndex]
+        self.bitboards = position
+        self.board = self.mailboxStack[self.positionIndex]
+        self.currentTurn = position[TURN_SLOT]
+        self.castlingRights = position[CASTLING_SLOT]
+        self.enPassantSquare = position[EN_PASSANT_SLOT]
+        self.halfMoveCounter = position[HALF_MOVE_SLOT]
+        self.fullMoveCounter = position[FULL_MOVE_SLOT]
 
     def unmake_move(self) -> None:
         move = self.moveStack.pop()
+        self.hash = self.hashStack.pop()
+
+        if self.copyMake:
+            self.restorePosition()
+            return
 
         start_square = move.start
         end_square = move.end
@@ -873,32 +469,11 @@ class Board:
         self.enPassantSquare = self.enPassantStack.pop()
 
         if move.isCastling():
-            turn = findPieceColor(move.movingPiece)
-            if turn == WHITE:
-                rook = WHITE | ROOK
-                if move.flag == Move.kingCastle:
-                    rookStart = squareNameToIndex("h1")
-                    rookEnd = squareNameToIndex("f1")
-                else:
-                    rookStart = squareNameToIndex("a1")
-                    rookEnd = squareNameToIndex("d1")
-                self.bitboards[rook] = setBit(self.bitboards[rook], rookStart)
-                self.bitboards[rook] = clearBit(self.bitboards[rook], rookEnd)
-                self.board[rookStart] = rook
-                self.board[rookEnd] = EMPTY
-
-            if turn == BLACK:
-                rook = BLACK | ROOK
-                if move.flag == Move.kingCastle:
-                    rookStart = squareNameToIndex("h8")
-                    rookEnd = squareNameToIndex("f8")
-                else:
-                    rookStart = squareNameToIndex("a8")
-                    rookEnd = squareNameToIndex("d8")
-                self.bitboards[rook] = setBit(self.bitboards[rook], rookStart)
-                self.bitboards[rook] = clearBit(self.bitboards[rook], rookEnd)
-                self.board[rookStart] = EMPTY
-                self.board[rookEnd] = rook
+            rook, rookStart, rookEnd = self.castlingRookMove(move)
+            self.bitboards[rook] = setBit(self.bitboards[rook], rookStart)
+            self.bitboards[rook] = clearBit(self.bitboards[rook], rookEnd)
+            self.board[rookStart] = rook
+            self.board[rookEnd] = EMPTY
 
         self.castlingRights = self.castlingRightsStack.pop()
 
@@ -911,10 +486,73 @@ class Board:
 
         self.currentTurn = (BLACK + WHITE) - self.currentTurn
 
+    def make_null_move(self) -> None:
+        # Passes the turn to the other side, only used by null move pruning.
+        # Reference: https://www.chessprogramming.org/Null_Move
+        if self.copyMake:
+            self.copyPosition()
+        else:
+            self.enPassantStack.append(self.enPassantSquare)
+            self.halfMoveCounterStack.append(self.halfMoveCounter)
+        self.hashStack.append(self.hash)
+        self.moveStack.append(None)
+
+        self.hash ^= ZOBRIST_SIDE_KEY
+        if self.enPassantSquare is not None:
+            self.hash ^= ZOBRIST_EN_PASSANT_KEYS[self.enPassantSquare]
+            self.enPassantSquare = None
+
+        # positions before a null move can not be repeated after it
+        self.halfMoveCounter = 0
+        self.currentTurn = (BLACK + WHITE) - self.currentTurn
+
+    def unmake_null_move(self) -> None:
+        self.moveStack.pop()
+        self.hash = self.hashStack.pop()
+
+        if self.copyMake:
+            self.restorePosition()
+            return
+
+        self.enPassantSquare = self.enPassantStack.pop()
+        self.halfMoveCounter = self.halfMoveCounterStack.pop()
+        self.currentTurn = (BLACK + WHITE) - self.currentTurn
+
+    def isRepetition(self, times: int = 1) -> bool:
+        # Whether the position occurred at least times before. Only positions since
+        # the last capture or pawn move can repeat and only every second one of them
+        # has the same side to move. hashStack[-k] is the position k plies ago.
+        # Reference: https://www.chessprogramming.org/Repetitions
+        hashStack = self.hashStack
+        oldest = max(len(hashStack) - self.halfMoveCounter, 0)
+        for index in range(len(hashStack) - 2, oldest - 1, -2):
+            if hashStack[index] == self.hash:
+                times -= 1
+                if times == 0:
+                    return True
+        return False
+
+    def isDraw(self) -> bool:
+        # a single repetition is scored as a draw, the side repeating could have
+        # repeated it again
+        return self.halfMoveCounter >= FIFTY_MOVE_LIMIT or self.isRepetition()
+
+    def hasNonPawnMaterial(self) -> bool:
+        side = self.currentTurn
+        return bool(
+            self.bitboards[side | KNIGHT]
+            | self.bitboards[side | BISHOP]
+            | self.bitboards[side | ROOK]
+            | self.bitboards[side | QUEEN]
+        )
+
     def legalMoves(self) -> list[Move]:
-        plmoves = self.generateMoves()
+        moveBuffer = self.moveBuffer
+        start = MAX_PLY * MAX_MOVES
+        end = MOVE_GENERATORS[self.currentTurn](self, moveBuffer, start)
         lmoves = []
-        for move in plmoves:
+        for index in range(start, end):
+            move = moveBuffer[index]
             self.make_move(move)
             if self.kingCanBeCaptured():
                 self.unmake_move()
@@ -931,20 +569,79 @@ class Board:
         )
         return self.isSquareAttackedBy(kingSquare, self.currentTurn)
 
-    def perft(self, depth: int) -> int:
+    def perft(self, depth: int, ply: int = 0) -> int:
+        self.stats.perftNodes += 1  # stats
         if depth == 0:
             return 1
 
         nodes = 0
 
-        moves = self.generateMoves()
-        for move in moves:
+        moveBuffer = self.moveBuffer
+        start = ply * MAX_MOVES
+        end = MOVE_GENERATORS[self.currentTurn](self, moveBuffer, start)
+        for index in range(start, end):
+            move = moveBuffer[index]
             self.make_move(move)
             if not self.kingCanBeCaptured():
-                nodes += self.perft(depth - 1)
+                nodes += self.perft(depth - 1, ply + 1)
             self.unmake_move()
         return nodes
 
+    def perftStats(self, depth: int, stats: dict = None, ply: int = 0) -> dict:
+        # Perft that also counts the kinds of moves leading to the leaves, to find
+        # which rule a move generation bug breaks. Only the moves at the last ply
+        # are classified, the plies above are walked like in perft.
+        if stats is None:
+            stats = dict.fromkeys(PERFT_COUNTERS, 0)
+        if depth == 0:
+            stats["nodes"] += 1
+            return stats
+
+        moveBuffer = self.moveBuffer
+        start = ply * MAX_MOVES
+        end = MOVE_GENERATORS[self.currentTurn](self, moveBuffer, start)
+        for index in range(start, end):
+            move = moveBuffer[index]
+            self.make_move(move)
+            if not self.kingCanBeCaptured():
+                if depth == 1:
+                    self.countLeaf(move, stats)
+                else:
+                    self.perftStats(depth - 1, stats, ply + 1)
+            self.unmake_move()
+        return stats
+
+    def countLeaf(self, move: Move, stats: dict) -> None:
+        stats["nodes"] += 1
+        if move.isMoveCapture():
+            stats["captures"] += 1
+        if move.isEnPassant():
+            stats["enPassants"] += 1
+        if move.isCastling():
+            stats["castles"] += 1
+        if move.isPromotion():
+            stats["promotions"] += 1
+
+        kingSquare = 63 - getLSBIndex(self.bitboards[self.currentTurn | KING])
+        checkers = self.attackersOf(kingSquare, (BLACK + WHITE) - self.currentTurn)
+        if not checkers:
+            return
+        stats["checks"] += 1
+
+        # a check is discovered when it is not given by the piece that moved, which
+        # is the rook after castling
+        movedTo = move.end
+        if move.flag == Move.kingCastle:
+            movedTo = move.end - 1
+        elif move.flag == Move.queenCastle:
+            movedTo = move.end + 1
+        if checkers & ~setBit(uint64(0), movedTo):
+            stats["discoveredChecks"] += 1
+        if int(checkers).bit_count() > 1:
+            stats["doubleChecks"] += 1
+        if not self.legalMoves():
+            stats["checkmates"] += 1
+
     def divide(self, depth: int) -> None:
         if depth == 0:
             raise "depth must be greater than 1 when calling divide"
@@ -973,68 +670,506 @@ class Board:
                 score += MATERIALSCORETABLE[pieceType]
                 score += PIECESQUARESCORES[pieceType][PIECESQUARESCORESINDEX[WHITE][i]]
 
+        # perfect knowledge for king and pawn versus king
+        if self.isKPK():
+            if not probeKPK(self.kpkBitbase, self):
+                return DRAW_SCORE
+            score += KPK_WIN_BONUS if self.bitboards[WHITE | PAWN] else -KPK_WIN_BONUS
+
         return score if self.currentTurn == WHITE else -score
 
+    def enableStats(self) -> None:
+        # the instrumented methods shadow the regular ones on this board only, the
+        # recursive calls go through self and so stay instrumented
+        for name in STATISTICS_METHODS:
+            setattr(self, name, getattr(self, name + "WithStats"))
+        self.statsEnabled = True
+
+    def disableStats(self) -> None:
+        for name in STATISTICS_METHODS:
+            self.__dict__.pop(name, None)
+        self.statsEnabled = False
+
+    def isKPK(self) -> bool:
+        return int(self.bitboards[ALL]).bit_count() == 3 and bool(
+            self.bitboards[WHITE | PAWN] | self.bitboards[BLACK | PAWN]
+        )
+
+    def isBitbaseDraw(self) -> bool:
+        return self.isKPK() and not probeKPK(self.kpkBitbase, self)
+
     def isInCheck(self) -> bool:
         kingSquare = 63 - getLSBIndex(self.bitboards[self.currentTurn | KING])
         otherSide = (BLACK + WHITE) - self.currentTurn
         return self.isSquareAttackedBy(kingSquare, otherSide)
 
-    def search(
-        self, depth: int, setBestMove: bool, alpha=float("-inf"), beta=float("inf")
-    ) -> float:
-        if depth == 0:
-            self.evaluatedCount += 1
-            return self.quiesce(alpha, beta, 2)
+    def iterativeSearch(self, maxDepth: int, reportIteration=None) -> int:
+        # Iterative deepening, every iteration after the first starts with an
+        # aspiration window around the score of the previous one.
+        # reportIteration(depth, score, principalVariation) is called after every
+        # completed iteration. When the search is stopped the unfinished iteration is
+        # thrown away and the result of the last completed one is kept.
+        self.nodeCount = 0
+        self.stats.reset()
+        self.bestMove = None
+        self.principalVariation = []
 
-        if setBestMove:
-            self.evaluatedCount = 0
+        score = 0
+        # deeper iterations would overrun the per ply slots of the move buffer
+        for depth in range(1, min(maxDepth, MAX_DEPTH) + 1):
+            self.stats.startIteration()  # stats
+            previousBestMove = self.bestMove
+            window = ASPIRATION_WINDOW
+            if depth > 1 and abs(score) < MATE_BOUND:
+                alpha, beta = score - window, score + window
+            else:
+                alpha, beta = -INFINITY, INFINITY
+
+            while True:
+                iterationScore = self.search(depth, True, alpha, beta)
+                if self.stopSearch:
+                    break
+                if iterationScore <= alpha and alpha > -INFINITY:
+                    window *= 4
+                    alpha = max(iterationScore - window, -INFINITY)
+                elif iterationScore >= beta and beta < INFINITY:
+                    window *= 4
+                    beta = min(iterationScore + window, INFINITY)
+                else:
+                    break
+
+            if self.stopSearch:
+                if previousBestMove is not None:
+                    self.bestMove = previousBestMove
+                break
+
+            self.stats.endIteration(depth)  # stats
+            score = iterationScore
+            self.principalVariation = self.getPrincipalVariation()
+            if self.principalVariation:
+                self.bestMove = self.principalVariation[0]
+            if reportIteration is not None:
+                reportIteration(depth, score, self.principalVariation)
+
+        return score
+
+    def multiPVSearch(
+        self, maxDepth: int, lineCount: int, reportIteration=None
+    ) -> list[tuple[Move, int, list[Move]]]:
+        # Multi-PV: every iteration searches the root once per line, each time without
+        # the first moves of the lines already found. All lines share the
+        # transposition table so later ones reuse the work of the earlier ones.
+        # Returns up to lineCount (move, score, principal variation) lines, best
+        # first. reportIteration(depth, lines) is called after every completed
+        # iteration.
+        self.nodeCount = 0
+        self.stats.reset()
+        self.bestMove = None
+        self.principalVariation = []
+
+        lines = []
+        for depth in range(1, min(maxDepth, MAX_DEPTH) + 1):
+            self.stats.startIteration()  # stats
+            iterationLines = []
+            self.excludedRootMoves = set()
+            while len(iterationLines) < lineCount:
+                score = self.search(depth, True)
+                principalVariation = self.getPrincipalVariation()
+                if self.stopSearch or not principalVariation:
+                    break
+                move = principalVariation[0]
+                iterationLines.append((move, score, principalVariation))
+                self.excludedRootMoves.add(move)
+            self.excludedRootMoves = set()
+
+            if self.stopSearch:
+                break
+
+            self.stats.endIteration(depth)  # stats
+            lines = sorted(iterationLines, key=lambda line: -line[1])
+            if reportIteration is not None:
+                reportIteration(depth, lines)
+
+        # the root searches of a stopped iteration may have changed the best move
+        if lines:
+            self.bestMove = lines[0][0]
+            self.principalVariation = lines[0][2]
+        return lines
 
-        moves = self.legalMoves()
-        moves.sort(key=self.move_value, reverse=True)
+    def search(
+        self,
+        depth: int,
+        setBestMove: bool,
+        alpha: int = -INFINITY,
+        beta: int = INFINITY,
+        ply: int = 0,
+        allowNullMove: bool = True,
+    ) -> int:
+        self.pvLength[ply] = ply
+
+        # Drawn positions are cut before the horizon so this also covers the positions
+        # quiescence search starts from. Inside it every move is a capture or a
+        # promotion, which can not lead to a repetition.
+        if ply > 0 and (self.isDraw() or self.isBitbaseDraw()):
+            return max(alpha, min(beta, DRAW_SCORE))
+
+        if depth <= 0:
+            return self.quiesce(alpha, beta, 2, ply)
+
+        self.nodeCount += 1
+        self.stats.nodes += 1  # stats
+        if self.nodeCount >= self.nodeLimit:
+            self.stopSearch = True
+        if self.stopSearch:
+            return 0
+
+        isPVNode = beta - alpha > 1
+        positionHash = self.hash
+
+        hashMove = None
+        entry = self.transpositionTable.get(positionHash)
+        self.stats.ttProbes += 1  # stats
+        if entry is not None:
+            self.stats.ttHits += 1  # stats
+            entryDepth, entryScore, entryBound, hashMove = entry
+            if not (isPVNode or setBestMove) and entryDepth >= depth:
+                entryScore = scoreFromTable(entryScore, ply)
+                if entryBound == EXACT_BOUND:
+                    self.stats.ttCutoffs += 1  # stats
+                    return max(alpha, min(beta, entryScore))
+                if entryBound == LOWER_BOUND and entryScore >= beta:
+                    self.stats.ttCutoffs += 1  # stats
+                    return beta
+                if entryBound == UPPER_BOUND and entryScore <= alpha:
+                    self.stats.ttCutoffs += 1  # stats
+                    return alpha
+
+        inCheck = self.isInCheck()
+        staticEvaluation = None
+        if not (setBestMove or inCheck):
+            staticEvaluation = self.evaluate()
+
+        # Reverse futility pruning: near the horizon a static evaluation far above
+        # beta is trusted to fail high
+        if (
+            self.useReverseFutilityPruning
+            and staticEvaluation is not None
+            and not isPVNode
+            and depth <= REVERSE_FUTILITY_MAX_DEPTH
+            and abs(beta) < MATE_BOUND
+            and staticEvaluation - REVERSE_FUTILITY_MARGIN * depth >= beta
+        ):
+            return beta
 
-        if moves == []:
-            if self.isInCheck():
-                return float("-inf")
-            else:
+        # Null move pruning: if passing still fails high the position is good enough
+        # to cut without searching any move. Skipped when in check, right after
+        # another null move, and when the side to move only has pawns left as
+        # zugzwang is likely there.
+        # Reference: https://www.chessprogramming.org/Null_Move_Pruning
+        if (
+            self.useNullMove
+            and allowNullMove
+            and staticEvaluation is not None
+            and not isPVNode
+            and depth >= 2
+            and abs(beta) < MATE_BOUND
+            and self.hasNonPawnMaterial()
+            and staticEvaluation >= beta
+        ):
+            reduction = 3 if depth >= 6 else 2
+            self.stats.nullMoveTries += 1  # stats
+            self.make_null_move()
+            evaluation = -self.search(
+                depth - 1 - reduction, False, -beta, -beta + 1, ply + 1, False
+            )
+            self.unmake_null_move()
+            if self.stopSearch:
                 return 0
+            if evaluation >= beta:
+                self.stats.nullMoveCutoffs += 1  # stats
+                return beta
 
-        for move in moves:
+        # Futility pruning: quiet moves can not raise alpha when even a margin on top
+        # of the static evaluation stays below it
+        futile = (
+            self.useFutilityPruning
+            and staticEvaluation is not None
+            and depth < len(FUTILITY_MARGINS)
+            and abs(alpha) < MATE_BOUND
+            and staticEvaluation + FUTILITY_MARGINS[depth] <= alpha
+        )
+        canReduce = (
+            self.useLateMoveReductions
+            and not (setBestMove or inCheck)
+            and depth >= LMR_MIN_DEPTH
+        )
+
+        bestMove = None
+        bound = UPPER_BOUND
+        legalMoveCount = 0
+        searchedMoveCount = 0
+
+        # Multi-PV searches the root without the moves of the lines found before, its
+        # scores are then not those of the position and must not be stored
+        excludedMoves = self.excludedRootMoves if setBestMove else None
+
+        for move in self.orderedMoves(ply, hashMove):
+            if excludedMoves and move in excludedMoves:
+                continue
+
+            # legality is only verified once the move is actually searched
             self.make_move(move)
-            evaluation = -self.search(depth - 1, False, -beta, -alpha)
+            if self.kingCanBeCaptured():
+                self.unmake_move()
+                continue
+            legalMoveCount += 1
+
+            isQuiet = not (move.isMoveCapture() or move.isPromotion())
+            if futile and isQuiet and legalMoveCount > 1 and not self.isInCheck():
+                self.unmake_move()
+                continue
+
+            # Late move reductions: quiet moves ordered late are searched to a
+            # reduced depth first and only searched again in full if they beat alpha
+            # Reference: https://www.chessprogramming.org/Late_Move_Reductions
+            reduction = 0
+            if (
+                canReduce
+                and isQuiet
+                and legalMoveCount > LMR_FULL_DEPTH_MOVES
+                and not self.isInCheck()
+            ):
+                reduction = min(
+                    LMR_REDUCTIONS[depth][min(legalMoveCount, MAX_MOVES - 1)],
+                    depth - 2,
+                )
+
+            # Principal variation search: the first move is searched with the full
+            # window, the others only have to prove they are not better with a zero
+            # window and are searched again with the full window when they are
+            # Reference: https://www.chessprogramming.org/Principal_Variation_Search
+            searchedMoveCount += 1
+            if searchedMoveCount == 1:
+                evaluation = -self.search(depth - 1, False, -beta, -alpha, ply + 1)
+            else:
+                self.stats.lmrReductions += reduction > 0  # stats
+                evaluation = -self.search(
+                    depth - 1 - reduction, False, -alpha - 1, -alpha, ply + 1
+                )
+                if evaluation > alpha and reduction > 0:
+                    self.stats.lmrResearches += 1  # stats
+                    evaluation = -self.search(
+                        depth - 1, False, -alpha - 1, -alpha, ply + 1
+                    )
+                if alpha < evaluation < beta:
+                    evaluation = -self.search(depth - 1, False, -beta, -alpha, ply + 1)
             self.unmake_move()
+
+            # scores of a stopped search are meaningless, nothing may be stored
+            if self.stopSearch:
+                return 0
+
             if evaluation >= beta:
+                self.stats.betaCutoffs += 1  # stats
+                self.stats.firstMoveCutoffs += searchedMoveCount == 1  # stats
                 if setBestMove:
                     self.bestMove = move
+                    self.updatePrincipalVariation(move, ply)
+                if isQuiet:
+                    self.storeKillerMove(move, ply)
+                if not excludedMoves:
+                    self.storeTransposition(
+                        positionHash, depth, beta, LOWER_BOUND, move, ply
+                    )
                 return beta
-            if alpha <= evaluation and setBestMove:
-                self.bestMove = move
-            alpha = max(alpha, evaluation)
+            if evaluation > alpha:
+                alpha = evaluation
+                bestMove = move
+                bound = EXACT_BOUND
+                self.updatePrincipalVariation(move, ply)
+                if setBestMove:
+                    self.bestMove = move
 
+        if legalMoveCount == 0:
+            if setBestMove:
+                self.bestMove = None
+            return -MATE_SCORE + ply if inCheck else 0
+
+        if not excludedMoves:
+            self.storeTransposition(
+                positionHash, depth, alpha, bound, bestMove or hashMove, ply
+            )
         return alpha
 
-    def move_value(self, move: Move) -> int:
-        value = 0
-        capturedPieceType = findPieceType(move.capturedPiece)
+    def storeTransposition(
+        self,
+        positionHash: int,
+        depth: int,
+        score: int,
+        bound: int,
+        move: Move,
+        ply: int,
+    ) -> None:
+        # Reference: https://www.chessprogramming.org/Transposition_Table
+        if len(self.transpositionTable) >= TRANSPOSITION_TABLE_SIZE:
+            self.transpositionTable.clear()
+        self.transpositionTable[positionHash] = (
+            depth,
+            scoreToTable(score, ply),
+            bound,
+            move,
+        )
+
+    def updatePrincipalVariation(self, move: Move, ply: int) -> None:
+        # Triangular PV table: the line of a ply is its best move followed by the
+        # line of the next ply
+        # Reference: https://www.chessprogramming.org/Triangular_PV-Table
+        childLength = self.pvLength[ply + 1]
+        principalVariation = self.pvTable[ply]
+        principalVariation[ply] = move
+        principalVariation[ply + 1 : childLength] = self.pvTable[ply + 1][
+            ply + 1 : childLength
+        ]
+        self.pvLength[ply] = max(childLength, ply + 1)
+
+    def getPrincipalVariation(self) -> list[Move]:
+        return self.pvTable[0][: self.pvLength[0]]
+
+    def storeKillerMove(self, move: Move, ply: int) -> None:
+        killers = self.killerMoves[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+    def orderedMoves(self, ply: int, hashMove: Move = None):
+        # Staged move generation, every stage is only generated once all the previous
+        # stages have been searched so a cutoff on the hash move or a good capture
+        # never pays for generating the quiet moves.
+        # Reference: https://www.chessprogramming.org/Move_Generation#Staged_Move_Generation
+        moveBuffer = self.moveBuffer
+        start = ply * MAX_MOVES
+
+        if hashMove is not None and self.isPseudoLegal(hashMove):
+            yield hashMove
+        else:
+            hashMove = None
+
+        # losing captures are moved to the front of the captures, over the slots of
+        # the captures that were already searched, and searched last
+        capturesEnd = self.generateCaptures(start)
+        losingCapturesEnd = start
+        for index in range(start, capturesEnd):
+            move = self.pickMove(index, capturesEnd)
+            if move == hashMove:
+                continue
+            if self.isLosingCapture(move):
+                moveBuffer[losingCapturesEnd] = move
+                losingCapturesEnd += 1
+                continue
+            yield move
+
+        firstKiller, secondKiller = self.killerMoves[ply]
+        if firstKiller == hashMove or not (
+            firstKiller is not None and self.isPseudoLegal(firstKiller)
+        ):
+            firstKiller = None
+        else:
+            yield firstKiller
+        if secondKiller == hashMove or not (
+            secondKiller is not None and self.isPseudoLegal(secondKiller)
+        ):
+            secondKiller = None
+        else:
+            yield secondKiller
+
+        quietsEnd = QUIET_GENERATORS[self.currentTurn](self, moveBuffer, capturesEnd)
+        for index in range(capturesEnd, quietsEnd):
+            move = moveBuffer[index]
+            if move == hashMove or move == firstKiller or move == secondKiller:
+                continue
+            yield move
+
+        for index in range(start, losingCapturesEnd):
+            yield moveBuffer[index]
+
+    def generateCaptures(self, start: int) -> int:
+        # Captures and promotions scored for MVV-LVA ordering
+        # Reference: https://www.chessprogramming.org/MVV-LVA
+        end = CAPTURE_GENERATORS[self.currentTurn](self, self.moveBuffer, start)
+        for index in range(start, end):
+            self.moveScores[index] = self.captureValue(self.moveBuffer[index])
+        return end
+
+    def pickMove(self, index: int, end: int) -> Move:
+        # Selection sort one step at a time: swaps the best scored move left in the
+        # range into index so only the moves that are actually searched get sorted
+        moveBuffer = self.moveBuffer
+        moveScores = self.moveScores
+        best = index
+        for candidate in range(index + 1, end):
+            if moveScores[candidate] > moveScores[best]:
+                best = candidate
+        moveBuffer[index], moveBuffer[best] = moveBuffer[best], moveBuffer[index]
+        moveScores[index], moveScores[best] = moveScores[best], moveScores[index]
+        return moveBuffer[index]
+
+    def captureValue(self, move: Move) -> int:
+        value = 10 * MATERIALSCORETABLE.get(findPieceType(move.capturedPiece), 0)
+        if move.isPromotion():
+            value += 10 * MATERIALSCORETABLE[findPieceType(move.promotedPiece())]
+        return value - MATERIALSCORETABLE[findPieceType(move.movingPiece)] // 100
+
+    def isLosingCapture(self, move: Move) -> bool:
+        # a capture is assumed to lose material when a more valuable piece takes a
+        # defended piece
+        if move.isPromotion() or move.isEnPassant():
+            return False
         movingPieceType = findPieceType(move.movingPiece)
-        dest = move.end
-        self.make_move(move)
-        if self.isInCheck():
-            value += 2000
-        if move.capturedPiece != EMPTY:
-            if movingPieceType == KING:
-                value += MATERIALSCORETABLE[capturedPieceType]
-            else:
-                value += MATERIALSCORETABLE[movingPieceType] - (
-                    MATERIALSCORETABLE[capturedPieceType]
-                    if self.isSquareAttackedBy(dest, self.currentTurn)
-                    else 0
-                )
-        self.unmake_move()
+        capturedPieceType = findPieceType(move.capturedPiece)
+        if MATERIALSCORETABLE[movingPieceType] <= MATERIALSCORETABLE[capturedPieceType]:
+            return False
+        otherSide = (BLACK + WHITE) - self.currentTurn
+        return self.isSquareAttackedBy(move.end, otherSide)
 
-        return value
+    def isPseudoLegal(self, move: Move) -> bool:
+        # Checks a move that was not generated for this position (hash and killer moves)
+        piece = move.movingPiece
+        if findPieceColor(piece) != self.currentTurn or self.board[move.start] != piece:
+            return False
+        if move.isCastling() or move.isEnPassant() or move.isDoublePush():
+            return move in self.generateMoves()
+        if self.board[move.end] != move.capturedPiece:
+            return False
+
+        pieceType = findPieceType(piece)
+        if pieceType == PAWN:
+            promotionRank = 0 if self.currentTurn == WHITE else 7
+            if bool(move.isPromotion()) != (move.end // 8 == promotionRank):
+                return False
+            if move.isMoveCapture():
+                attacks = self.pct.pawnAttackTable[self.currentTurn][move.start]
+                return bool(getBit(attacks, move.end))
+            offset = -8 if self.currentTurn == WHITE else 8
+            return move.end == move.start + offset
 
-    def quiesce(self, alpha: int, beta: int, max_depth: int):
+        occupied = self.bitboards[ALL]
+        if pieceType == KNIGHT:
+            attacks = self.pct.knightAttackTable[move.start]
+        elif pieceType == BISHOP:
+            attacks = self.pct.getBishopAttacks(move.start, occupied)
+        elif pieceType == ROOK:
+            attacks = self.pct.getRookAttacks(move.start, occupied)
+        elif pieceType == QUEEN:
+            attacks = self.pct.getQueenAttacks(move.start, occupied)
+        else:
+            attacks = self.pct.kingAttackTable[move.start]
+        return bool(getBit(attacks, move.end))
+
+    def quiesce(self, alpha: int, beta: int, max_depth: int, ply: int = 0):
+        self.nodeCount += 1
+        self.stats.qnodes += 1  # stats
+        if self.stopSearch:
+            return 0
         stand_pat = self.evaluate()
         if max_depth == 0:
             return stand_pat
@@ -1044,14 +1179,15 @@ class Board:
         if alpha < stand_pat:
             alpha = stand_pat
 
-        moves = self.legalMoves()
-
-        for move in moves:
-            if not move.isMoveCapture():
-                continue
-
+        start = ply * MAX_MOVES
+        end = self.generateCaptures(start)
+        for index in range(start, end):
+            move = self.pickMove(index, end)
             self.make_move(move)
-            score = -self.quiesce(-beta, -alpha, max_depth - 1)
+            if self.kingCanBeCaptured():
+                self.unmake_move()
+                continue
+            score = -self.quiesce(-beta, -alpha, max_depth - 1, ply + 1)
             self.unmake_move()
 
             if score >= beta:
@@ -1060,3 +1196,12 @@ class Board:
                 alpha = score
 
         return alpha
+
+
+# Methods updating statistics, see SearchStats. The regular methods are compiled
+# without the statistics lines and the instrumented ones are kept for enableStats.
+STATISTICS_METHODS = ["perft", "search", "quiesce", "iterativeSearch", "multiPVSearch"]
+for name in STATISTICS_METHODS:
+    instrumented = getattr(Board, name)
+    setattr(Board, name + "WithStats", instrumented)
+    setattr(Board, name, stripStatistics(instrumented))
@@ -1,5 +1,7 @@
 from numpy import uint64
 from numpy.random import randint
+from random import Random
+from math import log
 
 ##########################
 #   PIECE DEFINITIONS    #
@@ -221,6 +223,29 @@ def random_uint64_fewbits() -> uint64:
     return random_uint64() & random_uint64() & random_uint64()
 
 
+##########################
+#   ZOBRIST KEYS         #
+##########################
+# Reference: https://www.chessprogramming.org/Zobrist_Hashing
+# The keys are plain python integers to keep hashing clear of numpy scalar overhead
+# and use a fixed seed so that hashes are reproducible between runs.
+ZOBRIST_RANDOM = Random(0x5EED)
+
+# indexed like Board.bitboards, by the integer representation of the piece
+ZOBRIST_PIECE_KEYS = [
+    [ZOBRIST_RANDOM.getrandbits(64) for square in range(64)] for piece in range(23)
+]
+ZOBRIST_SIDE_KEY = ZOBRIST_RANDOM.getrandbits(64)
+ZOBRIST_CASTLING_KEYS = [ZOBRIST_RANDOM.getrandbits(64) for right in range(4)]
+# keys for every castling rights mask, see CASTLING CONSTS
+ZOBRIST_CASTLING_MASK_KEYS = [0] * 16
+for mask in range(16):
+    for right in range(4):
+        if mask & (1 << right):
+            ZOBRIST_CASTLING_MASK_KEYS[mask] ^= ZOBRIST_CASTLING_KEYS[right]
+ZOBRIST_EN_PASSANT_KEYS = [ZOBRIST_RANDOM.getrandbits(64) for square in range(64)]
+
+
 ##########################
 #   MAGIC NUMBERS        #
 ##########################
@@ -362,6 +387,23 @@ RMN = [
 
 ROOK_MAGIC_NUMBERS = [uint64(i) for i in RMN]
 
+##########################
+#   PERFT STATISTICS     #
+##########################
+# What Board.perftStats counts at the leaves, as in the tables at
+# Reference: https://www.chessprogramming.org/Perft_Results
+PERFT_COUNTERS = [
+    "nodes",
+    "captures",
+    "enPassants",
+    "castles",
+    "promotions",
+    "checks",
+    "discoveredChecks",
+    "doubleChecks",
+    "checkmates",
+]
+
 ##########################
 #   TEST FENS            #
 ##########################
@@ -380,6 +422,32 @@ WQINDEX = 1
 BKINDEX = 2
 BQINDEX = 3
 
+# castling rights are stored as a bit mask with one bit per index above
+WKMASK = 1 << WKINDEX
+WQMASK = 1 << WQINDEX
+BKMASK = 1 << BKINDEX
+BQMASK = 1 << BQINDEX
+ALLCASTLINGMASK = WKMASK | WQMASK | BKMASK | BQMASK
+
+
+def castlingRightsToString(castlingRights: int) -> str:
+    rights = ""
+    for right, mask in [("K", WKMASK), ("Q", WQMASK), ("k", BKMASK), ("q", BQMASK)]:
+        if castlingRights & mask:
+            rights += right
+    return rights if rights else "-"
+
+
+# castling rights kept when a piece moves from or to a square: moving the king or a
+# rook, or capturing a rook on its initial square, loses the relevant rights
+CASTLING_RIGHTS_KEPT = [ALLCASTLINGMASK] * 64
+CASTLING_RIGHTS_KEPT[squareNameToIndex("e1")] = ALLCASTLINGMASK & ~(WKMASK | WQMASK)
+CASTLING_RIGHTS_KEPT[squareNameToIndex("h1")] = ALLCASTLINGMASK & ~WKMASK
+CASTLING_RIGHTS_KEPT[squareNameToIndex("a1")] = ALLCASTLINGMASK & ~WQMASK
+CASTLING_RIGHTS_KEPT[squareNameToIndex("e8")] = ALLCASTLINGMASK & ~(BKMASK | BQMASK)
+CASTLING_RIGHTS_KEPT[squareNameToIndex("h8")] = ALLCASTLINGMASK & ~BKMASK
+CASTLING_RIGHTS_KEPT[squareNameToIndex("a8")] = ALLCASTLINGMASK & ~BQMASK
+
 WKEMPTYBB = uint64(6)
 WQEMPTYBB = uint64(112)
 BKEMPTYBB = uint64(432345564227567616)
@@ -407,6 +475,90 @@ BQATTACKSQUARES = [
     squareNameToIndex("e8"),
 ]
 
+##########################
+#   SEARCH CONSTS        #
+##########################
+
+MAX_PLY = 64
+# deepest iteration of iterative deepening, leaves room for quiescence search below it
+MAX_DEPTH = MAX_PLY // 2
+
+# size of the per ply slots of the move buffer, no position has more pseudo legal moves
+MAX_MOVES = 256
+
+# Layout of a position slot: the bitboards indexed by the integer representation of
+# the piece followed by the state that does not live in the bitboards. Copy-make saves
+# a position by writing this state into its slot and moving on to a copy of it.
+TURN_SLOT = 23
+CASTLING_SLOT = 24
+EN_PASSANT_SLOT = 25
+HALF_MOVE_SLOT = 26
+FULL_MOVE_SLOT = 27
+POSITION_SIZE = 28
+
+# the transposition table is cleared once it holds this many positions
+TRANSPOSITION_TABLE_SIZE = 1 << 20
+
+# Scores are bounded integers. Being mated at ply p scores -(MATE_SCORE - p) so that
+# shorter mates are preferred, every score beyond MATE_BOUND is a mate score.
+INFINITY = 1000000
+MATE_SCORE = 100000
+MATE_BOUND = MATE_SCORE - MAX_PLY
+DRAW_SCORE = 0
+
+# number of half moves without a capture or pawn move after which the game is drawn
+FIFTY_MOVE_LIMIT = 100
+
+# kinds of scores stored in the transposition table
+EXACT_BOUND = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# half width of the first aspiration window, widened on every fail low or high
+# Reference: https://www.chessprogramming.org/Aspiration_Windows
+ASPIRATION_WINDOW = 50
+
+
+def scoreToTable(score: int, ply: int) -> int:
+    # mate scores are stored relative to the position instead of the root
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def scoreFromTable(score: int, ply: int) -> int:
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+# Late move reductions indexed by remaining depth and move number, computed once at
+# startup. Reference: https://www.chessprogramming.org/Late_Move_Reductions
+LMR_REDUCTIONS = [[0] * MAX_MOVES for depth in range(MAX_PLY)]
+for depth in range(1, MAX_PLY):
+    for moveNumber in range(1, MAX_MOVES):
+        LMR_REDUCTIONS[depth][moveNumber] = int(
+            0.75 + log(depth) * log(moveNumber) / 2.25
+        )
+# quiet moves are only reduced after this many moves have been searched in full
+LMR_FULL_DEPTH_MOVES = 3
+LMR_MIN_DEPTH = 3
+
+# Futility margins indexed by remaining depth: quiet moves are pruned when the static
+# evaluation plus the margin can not raise alpha.
+# Reference: https://www.chessprogramming.org/Futility_Pruning
+FUTILITY_MARGINS = [0, 200, 500]
+
+# Reverse futility pruning cuts nodes whose static evaluation beats beta by this
+# margin per remaining depth.
+# Reference: https://www.chessprogramming.org/Reverse_Futility_Pruning
+REVERSE_FUTILITY_MARGIN = 120
+REVERSE_FUTILITY_MAX_DEPTH = 3
+
 ##########################
 #   SCORE TABLES         #
 ##########################
@@ -420,6 +572,10 @@ MATERIALSCORETABLE = {
     KING: 10000,
 }
 
+# Added for the side with the pawn in king and pawn versus king positions the bitbase
+# knows to be won. It stays below the value of a queen so promoting remains better.
+KPK_WIN_BONUS = 500
+
 PAWNSCORES = [
     90,
     90,
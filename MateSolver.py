@@ -0,0 +1,181 @@
+import sys
+import time
+
+from Board import Board
+
+# Mate solver based on proof-number search. The attacker only plays checking moves
+# and the tree is cut after the attacker's last move, so a mate is proven or
+# refuted without evaluating a single position. Positions solved once are kept in
+# a table and shared between transpositions.
+# Reference: https://www.chessprogramming.org/Proof-Number_Search
+
+PN_INFINITY = 10**9
+
+
+class ProofNode:
+    __slots__ = (
+        "move",
+        "parent",
+        "children",
+        "moves",
+        "isOr",
+        "plies",
+        "proof",
+        "disproof",
+    )
+
+    def __init__(self, move, parent, isOr: bool, plies: int) -> None:
+        self.move = move
+        self.parent = parent
+        self.children = None
+        self.moves = None
+        # the attacker is to move at OR nodes, the defender at AND nodes
+        self.isOr = isOr
+        # plies left until the mate has to be delivered
+        self.plies = plies
+        self.proof = 1
+        self.disproof = 1
+
+
+class MateSolver:
+    def __init__(self, board: Board, nodeLimit: int = 1000000) -> None:
+        self.board = board
+        self.nodeLimit = nodeLimit
+        self.nodeCount = 0
+        self.solvedPositions = {}
+
+    def solve(self, mateIn: int) -> dict:
+        # Tries to prove a mate in mateIn moves for the side to move
+        start = time.perf_counter()
+        self.nodeCount = 0
+
+        root = ProofNode(None, None, True, 2 * mateIn - 1)
+        self.evaluate(root)
+        while root.proof and root.disproof and self.nodeCount < self.nodeLimit:
+            node = self.selectMostProvingNode(root)
+            self.expand(node)
+            self.updateAncestors(node)
+
+        if root.proof == 0:
+            result = "mate"
+        elif root.disproof == 0:
+            result = "no mate"
+        else:
+            result = "unknown"
+        return {
+            "result": result,
+            "line": self.provenLine(root) if root.proof == 0 else [],
+            "nodes": self.nodeCount,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def nodeMoves(self, node: ProofNode) -> list:
+        moves = self.board.legalMoves()
+        if not node.isOr:
+            return moves
+
+        checks = []
+        for move in moves:
+            self.board.make_move(move)
+            if self.board.isInCheck():
+                checks.append(move)
+            self.board.unmake_move()
+        return checks
+
+    def evaluate(self, node: ProofNode) -> None:
+        # sets the proof and disproof numbers of a new node, the board is at its
+        # position
+        solved = self.solvedPositions.get((self.board.hash, node.plies))
+        if solved is not None:
+            self.setSolved(node, solved)
+            return
+
+        node.moves = self.nodeMoves(node)
+        if node.isOr:
+            if not node.moves:
+                self.setSolved(node, False)
+            else:
+                node.proof, node.disproof = 1, len(node.moves)
+        elif not node.moves:
+            # the attacker only gives checks so this is checkmate
+            self.setSolved(node, True)
+        elif node.plies == 0:
+            self.setSolved(node, False)
+        else:
+            node.proof, node.disproof = len(node.moves), 1
+
+    def setSolved(self, node: ProofNode, proven: bool) -> None:
+        node.proof, node.disproof = (0, PN_INFINITY) if proven else (PN_INFINITY, 0)
+
+    def selectMostProvingNode(self, node: ProofNode) -> ProofNode:
+        # walks down to the leaf that proves or disproves the root the cheapest,
+        # making the moves on the way
+        while node.children:
+            if node.isOr:
+                node = min(node.children, key=lambda child: child.proof)
+            else:
+                node = min(node.children, key=lambda child: child.disproof)
+            self.board.make_move(node.move)
+        return node
+
+    def expand(self, node: ProofNode) -> None:
+        node.children = []
+        for move in node.moves:
+            child = ProofNode(move, node, not node.isOr, node.plies - 1)
+            self.board.make_move(move)
+            self.evaluate(child)
+            self.board.unmake_move()
+            node.children.append(child)
+            self.nodeCount += 1
+        node.moves = None
+
+    def updateAncestors(self, node: ProofNode) -> None:
+        # backs the new numbers up to the root, unmaking the moves on the way
+        while True:
+            children = node.children
+            if node.isOr:
+                node.proof = min(child.proof for child in children)
+                node.disproof = min(
+                    sum(child.disproof for child in children), PN_INFINITY
+                )
+            else:
+                node.proof = min(sum(child.proof for child in children), PN_INFINITY)
+                node.disproof = min(child.disproof for child in children)
+
+            if node.proof == 0 or node.disproof == 0:
+                self.solvedPositions[(self.board.hash, node.plies)] = node.proof == 0
+
+            if node.parent is None:
+                return
+            self.board.unmake_move()
+            node = node.parent
+
+    def provenLine(self, root: ProofNode) -> list:
+        # The attacker plays a proven move, the defender the reply whose proof took
+        # the most work. Lines through positions solved by transposition stop there.
+        line = []
+        node = root
+        while node.children:
+            if node.isOr:
+                node = next(child for child in node.children if child.proof == 0)
+            else:
+                node = max(node.children, key=lambda child: treeSize(child))
+            line.append(node.move)
+        return line
+
+
+def treeSize(node: ProofNode) -> int:
+    if not node.children:
+        return 1
+    return 1 + sum(treeSize(child) for child in node.children)
+
+
+if __name__ == "__main__":
+    # python MateSolver.py "<fen>" <mate in>
+    board = Board()
+    board.setToFen(sys.argv[1])
+    result = MateSolver(board).solve(int(sys.argv[2]))
+    print(f"result: {result['result']}")
+    print(f"line:   {' '.join(str(move) for move in result['line'])}")
+    print(f"nodes:  {result['nodes']}")
+    print(f"time:   {result['seconds']:.2f}s")
@@ -0,0 +1,36 @@
+import unittest
+from Board import Board
+from MateSolver import MateSolver
+
+PHILIDOR = "r6k/6pp/7N/8/8/1Q6/8/6K1 w - - 0 1"
+
+
+class TestMateSolver(unittest.TestCase):
+    def solve(self, fen, mateIn):
+        board = Board()
+        board.setToFen(fen)
+        result = MateSolver(board).solve(mateIn)
+        # the board is left as it was
+        self.assertEqual(board.getFen(), fen)
+        return result
+
+    def test_mate_in_one(self):
+        result = self.solve("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1", 1)
+        self.assertEqual(result["result"], "mate")
+        self.assertEqual([str(move) for move in result["line"]], ["d1d8"])
+
+    def test_mate_in_two(self):
+        result = self.solve(PHILIDOR, 2)
+        self.assertEqual(result["result"], "mate")
+        self.assertEqual(
+            [str(move) for move in result["line"]], ["b3g8", "a8g8", "h6f7"]
+        )
+
+    def test_refutes_shorter_mate(self):
+        result = self.solve(PHILIDOR, 1)
+        self.assertEqual(result["result"], "no mate")
+        self.assertEqual(result["line"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
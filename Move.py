@@ -21,6 +21,9 @@ class Move:
     rPromoCapture = uint8(0b1110)
     qPromoCapture = uint8(0b1111)
 
+    promotionFlags = (nPromo, bPromo, rPromo, qPromo)
+    promotionCaptureFlags = (nPromoCapture, bPromoCapture, rPromoCapture, qPromoCapture)
+
     def __init__(
         self,
         start: int,
@@ -35,6 +38,17 @@ class Move:
         self.movingPiece = movingPiece
         self.capturedPiece = capturedPiece
 
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Move)
+            and self.start == other.start
+            and self.end == other.end
+            and self.flag == other.flag
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.start, self.end, int(self.flag)))
+
     def isMoveQuiet(self) -> bool:
         return self.flag == self.quietMove
 
@@ -0,0 +1,344 @@
+import importlib.util
+import os
+from string import Template
+
+from ChessFunctionsAndConstants import *
+
+# The pseudo legal move generator is written once as a template and rendered into one
+# function per side with the side dependent constants (push direction, promotion rank,
+# castling masks, enemy color...) baked in, so the generated code never has to branch
+# on the side to move or on the identity of the piece it is looking at.
+#
+# Generated functions write the moves into a preallocated move buffer starting at the
+# given index and return the index one past the last move written.
+#
+# The rendered source is written next to this module and imported like any other
+# module, so python caches its bytecode and importing Board stays fast. The file is
+# only rewritten when the template or the side constants change.
+
+GENERATED_MODULE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "GeneratedMoveGenerators.py"
+)
+
+MODULE_HEADER = """\
+# Generated by MoveGenerator.py, do not edit by hand.
+from ChessFunctionsAndConstants import *
+from Move import Move
+"""
+
+FUNCTION_TEMPLATE = Template(
+    """
+
+def generate${side}${kind}(board, moveBuffer, index):
+    bitboards = board.bitboards
+    mailbox = board.board
+    pct = board.pct
+    occupied = bitboards[ALL]
+    empty = ~occupied
+    enemies = bitboards[$them]
+
+    # Pawns are generated set-wise, the source square of each target is
+    # recovered from the offset of the shift that produced it
+    pawns = bitboards[$pawn]
+    pushes = $push(pawns) & empty
+    promotionRank = RANKS[$promotionRank]
+$body
+    return index
+"""
+)
+
+PAWN_QUIETS_TEMPLATE = Template(
+    """
+    targets = pushes & ~promotionRank
+    while targets:
+        target_square = 63 - getLSBIndex(targets)
+        moveBuffer[index] = Move(
+            target_square + $pushOffset, target_square, Move.quietMove, $pawn
+        )
+        index += 1
+        targets = popLSB(targets)
+
+    targets = $push(pushes & RANKS[$doublePushRank]) & empty
+    while targets:
+        target_square = 63 - getLSBIndex(targets)
+        moveBuffer[index] = Move(
+            target_square + $doublePushOffset,
+            target_square,
+            Move.doublePawnPush,
+            $pawn,
+        )
+        index += 1
+        targets = popLSB(targets)
+"""
+)
+
+# promotions are generated together with the captures as they change the material
+# balance just like them
+PAWN_CAPTURES_TEMPLATE = Template(
+    """
+    targets = pushes & promotionRank
+    while targets:
+        target_square = 63 - getLSBIndex(targets)
+        for flag in Move.promotionFlags:
+            moveBuffer[index] = Move(
+                target_square + $pushOffset, target_square, flag, $pawn
+            )
+            index += 1
+        targets = popLSB(targets)
+
+    westCaptures = $westCapture(pawns) & enemies
+    eastCaptures = $eastCapture(pawns) & enemies
+    for captures, offset in ((westCaptures, $westOffset), (eastCaptures, $eastOffset)):
+        targets = captures & ~promotionRank
+        while targets:
+            target_square = 63 - getLSBIndex(targets)
+            moveBuffer[index] = Move(
+                target_square + offset,
+                target_square,
+                Move.capture,
+                $pawn,
+                mailbox[target_square],
+            )
+            index += 1
+            targets = popLSB(targets)
+
+        targets = captures & promotionRank
+        while targets:
+            target_square = 63 - getLSBIndex(targets)
+            for flag in Move.promotionCaptureFlags:
+                moveBuffer[index] = Move(
+                    target_square + offset,
+                    target_square,
+                    flag,
+                    $pawn,
+                    mailbox[target_square],
+                )
+                index += 1
+            targets = popLSB(targets)
+
+    enPassantSquare = board.enPassantSquare
+    if enPassantSquare is not None:
+        sources = pct.pawnAttackTable[$them][enPassantSquare] & pawns
+        while sources:
+            source_square = 63 - getLSBIndex(sources)
+            moveBuffer[index] = Move(
+                source_square, enPassantSquare, Move.epCapture, $pawn, $them | PAWN
+            )
+            index += 1
+            sources = popLSB(sources)
+"""
+)
+
+PIECE_TEMPLATE = Template(
+    """
+    bitboard = bitboards[$piece]
+    while bitboard:
+        source_square = 63 - getLSBIndex(bitboard)
+        attacks = $attacks
+$serialize
+        bitboard = popLSB(bitboard)
+"""
+)
+
+PIECE_CAPTURES_TEMPLATE = Template(
+    """
+        captures = attacks & enemies
+        while captures:
+            target_square = 63 - getLSBIndex(captures)
+            moveBuffer[index] = Move(
+                source_square,
+                target_square,
+                Move.capture,
+                $piece,
+                mailbox[target_square],
+            )
+            index += 1
+            captures = popLSB(captures)
+"""
+)
+
+PIECE_QUIETS_TEMPLATE = Template(
+    """
+        quiets = attacks & empty
+        while quiets:
+            target_square = 63 - getLSBIndex(quiets)
+            moveBuffer[index] = Move(
+                source_square, target_square, Move.quietMove, $piece
+            )
+            index += 1
+            quiets = popLSB(quiets)
+"""
+)
+
+CASTLING_TEMPLATE = Template(
+    """
+    castlingRights = board.castlingRights
+    if castlingRights & $kingSideMask and not (occupied & $kingSideEmpty):
+        if not (
+            board.isSquareAttackedBy($kingSideAttacked0, $them)
+            or board.isSquareAttackedBy($kingSideAttacked1, $them)
+            or board.isSquareAttackedBy($kingSideAttacked2, $them)
+        ):
+            moveBuffer[index] = Move(
+                $kingSquare, $kingSideTarget, Move.kingCastle, $king
+            )
+            index += 1
+
+    if castlingRights & $queenSideMask and not (occupied & $queenSideEmpty):
+        if not (
+            board.isSquareAttackedBy($queenSideAttacked0, $them)
+            or board.isSquareAttackedBy($queenSideAttacked1, $them)
+            or board.isSquareAttackedBy($queenSideAttacked2, $them)
+        ):
+            moveBuffer[index] = Move(
+                $kingSquare, $queenSideTarget, Move.queenCastle, $king
+            )
+            index += 1
+"""
+)
+
+# Every generated function is assembled from these sections. Moves is the complete
+# pseudo legal move list, Captures and Quiets split it for staged move generation.
+GENERATOR_KINDS = {
+    "Moves": [PAWN_QUIETS_TEMPLATE, PAWN_CAPTURES_TEMPLATE],
+    "Captures": [PAWN_CAPTURES_TEMPLATE],
+    "Quiets": [PAWN_QUIETS_TEMPLATE],
+}
+GENERATOR_PIECE_SECTIONS = {
+    "Moves": [PIECE_CAPTURES_TEMPLATE, PIECE_QUIETS_TEMPLATE],
+    "Captures": [PIECE_CAPTURES_TEMPLATE],
+    "Quiets": [PIECE_QUIETS_TEMPLATE],
+}
+GENERATOR_CASTLES = {"Moves": True, "Captures": False, "Quiets": True}
+
+PIECE_ATTACKS = [
+    ("KNIGHT", "pct.knightAttackTable[source_square]"),
+    ("BISHOP", "pct.getBishopAttacks(source_square, occupied)"),
+    ("ROOK", "pct.getRookAttacks(source_square, occupied)"),
+    ("QUEEN", "pct.getQueenAttacks(source_square, occupied)"),
+    ("KING", "pct.kingAttackTable[source_square]"),
+]
+
+SIDE_CONSTANTS = {
+    WHITE: {
+        "side": "White",
+        "them": "BLACK",
+        "push": "north",
+        "westCapture": "northwest",
+        "eastCapture": "northeast",
+        "doublePushRank": 2,
+        "promotionRank": 7,
+        "pushOffset": 8,
+        "doublePushOffset": 16,
+        "westOffset": 9,
+        "eastOffset": 7,
+        "kingSquare": squareNameToIndex("e1"),
+        "kingSideMask": "WKMASK",
+        "kingSideEmpty": "WKEMPTYBB",
+        "kingSideAttacked": WKATTACKSQUARES,
+        "kingSideTarget": squareNameToIndex("g1"),
+        "queenSideMask": "WQMASK",
+        "queenSideEmpty": "WQEMPTYBB",
+        "queenSideAttacked": WQATTACKSQUARES,
+        "queenSideTarget": squareNameToIndex("c1"),
+    },
+    BLACK: {
+        "side": "Black",
+        "them": "WHITE",
+        "push": "south",
+        "westCapture": "southwest",
+        "eastCapture": "southeast",
+        "doublePushRank": 5,
+        "promotionRank": 0,
+        "pushOffset": -8,
+        "doublePushOffset": -16,
+        "westOffset": -7,
+        "eastOffset": -9,
+        "kingSquare": squareNameToIndex("e8"),
+        "kingSideMask": "BKMASK",
+        "kingSideEmpty": "BKEMPTYBB",
+        "kingSideAttacked": BKATTACKSQUARES,
+        "kingSideTarget": squareNameToIndex("g8"),
+        "queenSideMask": "BQMASK",
+        "queenSideEmpty": "BQEMPTYBB",
+        "queenSideAttacked": BQATTACKSQUARES,
+        "queenSideTarget": squareNameToIndex("c8"),
+    },
+}
+
+
+def renderMoveGenerator(side: int, kind: str) -> str:
+    constants = dict(SIDE_CONSTANTS[side])
+    color = constants["side"].upper()
+    constants["kind"] = kind
+    constants["pawn"] = f"{color} | PAWN"
+    constants["king"] = f"{color} | KING"
+    for castle in ["kingSide", "queenSide"]:
+        for i, square in enumerate(constants.pop(castle + "Attacked")):
+            constants[f"{castle}Attacked{i}"] = square
+
+    body = "".join(
+        section.substitute(constants) for section in GENERATOR_KINDS[kind]
+    )
+    for piece, attacks in PIECE_ATTACKS:
+        piece = f"{color} | {piece}"
+        serialize = "".join(
+            section.substitute(piece=piece)
+            for section in GENERATOR_PIECE_SECTIONS[kind]
+        )
+        body += PIECE_TEMPLATE.substitute(
+            piece=piece,
+            attacks=f"{attacks} & ~bitboards[{color}]",
+            serialize=serialize,
+        )
+    if GENERATOR_CASTLES[kind]:
+        body += CASTLING_TEMPLATE.substitute(constants)
+    constants["body"] = body
+
+    return FUNCTION_TEMPLATE.substitute(constants)
+
+
+def renderMoveGenerators() -> str:
+    return MODULE_HEADER + "".join(
+        renderMoveGenerator(side, kind)
+        for side in [WHITE, BLACK]
+        for kind in GENERATOR_KINDS
+    )
+
+
+def loadMoveGenerators() -> dict:
+    source = renderMoveGenerators()
+
+    try:
+        with open(GENERATED_MODULE_PATH) as cachedFile:
+            isStale = cachedFile.read() != source
+    except FileNotFoundError:
+        isStale = True
+
+    if isStale:
+        # write to a temporary file first so that concurrently starting processes
+        # never import a half written module
+        temporaryPath = f"{GENERATED_MODULE_PATH}.{os.getpid()}.tmp"
+        with open(temporaryPath, "w") as temporaryFile:
+            temporaryFile.write(source)
+        os.replace(temporaryPath, GENERATED_MODULE_PATH)
+
+    spec = importlib.util.spec_from_file_location(
+        "GeneratedMoveGenerators", GENERATED_MODULE_PATH
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return {
+        kind: {
+            WHITE: getattr(module, f"generateWhite{kind}"),
+            BLACK: getattr(module, f"generateBlack{kind}"),
+        }
+        for kind in GENERATOR_KINDS
+    }
+
+
+GENERATORS = loadMoveGenerators()
+MOVE_GENERATORS = GENERATORS["Moves"]
+CAPTURE_GENERATORS = GENERATORS["Captures"]
+QUIET_GENERATORS = GENERATORS["Quiets"]
@@ -0,0 +1,29 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Helpers for the tools that spread positions over a pool of processes
+
+
+def boundedMap(function, items, workers: int = None, window: int = None):
+    # Yields function(*item) for every item in the order the results complete. Only
+    # window items are taken from the iterable at a time, so it can be a generator
+    # over a file of any size. Leaving the loop early cancels what is still pending.
+    workers = workers or os.cpu_count()
+    window = window or 2 * workers
+    items = iter(items)
+    with ProcessPoolExecutor(workers) as pool:
+        pending = set()
+        try:
+            while True:
+                for item in items:
+                    pending.add(pool.submit(function, *item))
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from Board import Board
+
+# Driver for deep perft runs that take hours. The tree is split into the subtrees
+# below the first one or two plies, and the count of every finished subtree is
+# appended to a JSON lines checkpoint file. Restarted with the same file, the driver
+# only walks the subtrees that are not in it yet.
+#
+# The first line of the checkpoint records the run it belongs to:
+#   {"fen": ..., "depth": 7, "splitDepth": 1}
+# followed by one line per finished subtree:
+#   {"path": ["e2e4"], "nodes": 119060324, "seconds": 1450.2}
+
+
+def subtreePaths(board: Board, splitDepth: int) -> list[list[str]]:
+    # the move sequences leading to the roots of the subtrees
+    if splitDepth == 0:
+        return [[]]
+    paths = []
+    for move in board.legalMoves():
+        board.make_move(move)
+        for path in subtreePaths(board, splitDepth - 1):
+            paths.append([str(move)] + path)
+        board.unmake_move()
+    return paths
+
+
+def readCheckpoint(path: str, header: dict) -> dict:
+    # returns the subtrees finished so far as {path: nodes}
+    finished = {}
+    if not os.path.exists(path):
+        return finished
+
+    with open(path) as checkpointFile:
+        contents = checkpointFile.read()
+    if not contents.endswith("\n"):
+        # the process died while writing the last line, drop it so that the next
+        # line is not appended to it
+        contents = contents[: contents.rfind("\n") + 1]
+        with open(path, "w") as checkpointFile:
+            checkpointFile.write(contents)
+
+    lines = contents.splitlines()
+    if not lines:
+        return finished
+    if json.loads(lines[0]) != header:
+        raise ValueError(f"checkpoint {path} belongs to a different perft run")
+    for line in lines[1:]:
+        entry = json.loads(line)
+        finished[tuple(entry["path"])] = entry["nodes"]
+    return finished
+
+
+def formatSeconds(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
+
+
+def checkpointedPerft(
+    fen: str,
+    depth: int,
+    checkpointPath: str,
+    splitDepth: int = 1,
+    reportProgress=None,
+) -> dict:
+    # Returns the total node count and the count per root move. reportProgress is
+    # called with a line of text after every subtree.
+    if depth < 1:
+        raise ValueError("depth must be at least 1")
+    splitDepth = min(splitDepth, depth)
+    header = {"fen": fen, "depth": depth, "splitDepth": splitDepth}
+    finished = readCheckpoint(checkpointPath, header)
+
+    board = Board()
+    board.setToFen(fen)
+    paths = subtreePaths(board, splitDepth)
+    remaining = [path for path in paths if tuple(path) not in finished]
+
+    with open(checkpointPath, "a") as checkpointFile:
+        if checkpointFile.tell() == 0:
+            checkpointFile.write(json.dumps(header) + "\n")
+
+        searchedNodes = 0
+        searchedSeconds = 0.0
+        for number, path in enumerate(remaining, 1):
+            start = time.perf_counter()
+            for move in path:
+                board.make_move(board.parseMove(move))
+            nodes = board.perft(depth - splitDepth)
+            for move in path:
+                board.unmake_move()
+            seconds = time.perf_counter() - start
+
+            entry = {"path": path, "nodes": nodes, "seconds": round(seconds, 3)}
+            checkpointFile.write(json.dumps(entry) + "\n")
+            checkpointFile.flush()
+            os.fsync(checkpointFile.fileno())
+            finished[tuple(path)] = nodes
+
+            if reportProgress is not None:
+                # the subtrees left are assumed to be as large as the ones searched
+                searchedNodes += nodes
+                searchedSeconds += seconds
+                nodesPerSecond = searchedNodes / max(searchedSeconds, 1e-9)
+                left = len(remaining) - number
+                estimate = left * searchedNodes / number / max(nodesPerSecond, 1e-9)
+                reportProgress(
+                    f"{len(finished)}/{len(paths)} {' '.join(path)}: {nodes} nodes, "
+                    f"{int(nodesPerSecond)} nps, eta {formatSeconds(estimate)}"
+                )
+
+    divide = {}
+    for path, nodes in finished.items():
+        divide[path[0]] = divide.get(path[0], 0) + nodes
+    return {"nodes": sum(divide.values()), "divide": divide}
+
+
+def main(arguments: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Resumable perft")
+    parser.add_argument("fen")
+    parser.add_argument("depth", type=int)
+    parser.add_argument(
+        "--split-depth",
+        type=int,
+        default=1,
+        help="plies below which the subtrees are checkpointed (1 or 2)",
+    )
+    parser.add_argument("--checkpoint", default="perft.checkpoint.jsonl")
+    options = parser.parse_args(arguments)
+
+    result = checkpointedPerft(
+        options.fen, options.depth, options.checkpoint, options.split_depth, print
+    )
+    for move, nodes in result["divide"].items():
+        print(f"{move}: {nodes}")
+    print(f"nodes: {result['nodes']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
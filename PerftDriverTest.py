@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+from PerftDriver import checkpointedPerft
+
+KIWIPETE_FEN = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+class TestPerftDriver(unittest.TestCase):
+    def test_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "perft.jsonl")
+            result = checkpointedPerft(KIWIPETE_FEN, 3, path)
+            self.assertEqual(result["nodes"], 97862)
+            self.assertEqual(len(result["divide"]), 48)
+
+            # keep the header and ten subtrees, and cut the last line short as if
+            # the process had died while writing it
+            with open(path) as checkpointFile:
+                lines = checkpointFile.read().splitlines()
+            self.assertEqual(len(lines), 49)
+            with open(path, "w") as checkpointFile:
+                checkpointFile.write("\n".join(lines[:11]) + "\n" + lines[11][:10])
+
+            progress = []
+            result = checkpointedPerft(KIWIPETE_FEN, 3, path, 1, progress.append)
+            self.assertEqual(result["nodes"], 97862)
+            self.assertEqual(len(progress), 48 - 10)
+            self.assertTrue(progress[-1].startswith("48/48 "))
+            self.assertIn("eta", progress[-1])
+            with open(path) as checkpointFile:
+                self.assertEqual(len(checkpointFile.read().splitlines()), 49)
+
+            with self.assertRaises(ValueError):
+                checkpointedPerft(KIWIPETE_FEN, 2, path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import argparse
+import re
+import subprocess
+import sys
+import time
+
+from Board import Board
+from Parallel import boundedMap
+
+# Runs perft suites in the EPD format of perftsuite.epd, one position per line with
+# the expected node counts as operations:
+#   rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - ;D1 20 ;D2 400 ;D3 8902
+# The file is read lazily and the positions are checked in a pool of processes.
+# For the first position that fails, the node counts per root move are printed,
+# next to those of a reference engine when one is given. Any UCI engine that
+# understands "go perft <depth>", like Stockfish, can serve as the reference.
+
+
+def parseEpdLine(line: str) -> tuple[str, dict]:
+    # returns the FEN and the expected node count per depth
+    fields = line.split(";")
+    fen = fields[0].split()
+    if len(fen) == 4:
+        # EPD leaves out the move counters
+        fen += ["0", "1"]
+    expected = {}
+    for operation in fields[1:]:
+        match = re.fullmatch(r"\s*D(\d+)\s+(\d+)\s*", operation)
+        if match:
+            expected[int(match.group(1))] = int(match.group(2))
+    return " ".join(fen), expected
+
+
+def readEpd(path: str):
+    with open(path) as epdFile:
+        for line in epdFile:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield parseEpdLine(line)
+
+
+def checkPosition(fen: str, expected: dict, maxDepth: int) -> dict:
+    # runs in a worker process, stops at the first depth whose count is wrong
+    board = Board()
+    board.setToFen(fen)
+    result = {"fen": fen, "depths": [], "nodes": 0, "failedDepth": None}
+    for depth in sorted(expected):
+        if depth > maxDepth:
+            break
+        nodes = board.perft(depth)
+        result["depths"].append((depth, expected[depth], nodes))
+        result["nodes"] += nodes
+        if nodes != expected[depth]:
+            result["failedDepth"] = depth
+            break
+    return result
+
+
+def divide(fen: str, depth: int) -> dict:
+    board = Board()
+    board.setToFen(fen)
+    counts = {}
+    for move in board.legalMoves():
+        board.make_move(move)
+        counts[str(move)] = board.perft(depth - 1)
+        board.unmake_move()
+    return counts
+
+
+def referenceDivide(enginePath: str, fen: str, depth: int) -> dict:
+    commands = f"uci\nposition fen {fen}\ngo perft {depth}\nisready\nquit\n"
+    output = subprocess.run(
+        [enginePath], input=commands, capture_output=True, text=True, timeout=3600
+    ).stdout
+    counts = {}
+    for line in output.splitlines():
+        match = re.fullmatch(r"([a-h][1-8][a-h][1-8][qrbn]?): (\d+)", line.strip())
+        if match:
+            counts[match.group(1)] = int(match.group(2))
+    return counts
+
+
+def divideDiff(counts: dict, referenceCounts: dict) -> list[str]:
+    lines = []
+    for move in sorted(set(counts) | set(referenceCounts)):
+        if move not in referenceCounts:
+            lines.append(f"{move}: {counts[move]} (illegal in the reference)")
+        elif move not in counts:
+            lines.append(f"{move}: missing, reference {referenceCounts[move]}")
+        elif counts[move] != referenceCounts[move]:
+            lines.append(f"{move}: {counts[move]}, reference {referenceCounts[move]}")
+    return lines
+
+
+def runSuite(
+    positions,
+    workers: int = None,
+    maxDepth: int = 64,
+    stopOnFailure: bool = False,
+    referenceEngine: str = None,
+    report=print,
+) -> dict:
+    # positions is an iterable of (fen, expected) pairs, only a few more than there
+    # are workers are taken from it at a time
+    start = time.perf_counter()
+    summary = {"positions": 0, "failures": [], "nodes": 0}
+    results = boundedMap(
+        checkPosition, ((fen, expected, maxDepth) for fen, expected in positions), workers
+    )
+    for result in results:
+        summary["positions"] += 1
+        summary["nodes"] += result["nodes"]
+        reportResult(result, report)
+        if result["failedDepth"] is None:
+            continue
+
+        if not summary["failures"]:
+            reportDivide(result, referenceEngine, report)
+        summary["failures"].append(result["fen"])
+        if stopOnFailure:
+            results.close()
+            break
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["nps"] = summary["nodes"] / max(summary["seconds"], 1e-9)
+    report(
+        f"{summary['positions']} positions, {len(summary['failures'])} failed, "
+        f"{summary['nodes']} nodes in {summary['seconds']:.2f}s, "
+        f"{int(summary['nps'])} nps"
+    )
+    return summary
+
+
+def reportResult(result: dict, report) -> None:
+    if result["failedDepth"] is None:
+        report(f"ok   {result['fen']} ({result['nodes']} nodes)")
+        return
+    depth, expected, nodes = result["depths"][-1]
+    report(f"FAIL {result['fen']} depth {depth}: expected {expected}, got {nodes}")
+
+
+def reportDivide(result: dict, referenceEngine: str, report) -> None:
+    fen, depth = result["fen"], result["failedDepth"]
+    counts = divide(fen, depth)
+    if referenceEngine is None:
+        report(f"divide at depth {depth}:")
+        for move, nodes in counts.items():
+            report(f"  {move}: {nodes}")
+        return
+
+    lines = divideDiff(counts, referenceDivide(referenceEngine, fen, depth))
+    report(f"divide at depth {depth} against {referenceEngine}:")
+    for line in lines or ["no differences"]:
+        report(f"  {line}")
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Run an EPD perft suite")
+    parser.add_argument("epd")
+    parser.add_argument("--workers", type=int, help="default: one per processor")
+    parser.add_argument(
+        "--max-depth", type=int, default=64, help="skip the expectations beyond it"
+    )
+    parser.add_argument("--stop-on-failure", action="store_true")
+    parser.add_argument(
+        "--reference-engine", help="UCI engine supporting go perft for the divide"
+    )
+    options = parser.parse_args(arguments)
+
+    summary = runSuite(
+        readEpd(options.epd),
+        options.workers,
+        options.max_depth,
+        options.stop_on_failure,
+        options.reference_engine,
+    )
+    return 1 if summary["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
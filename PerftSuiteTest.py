@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from PerftSuite import divideDiff, parseEpdLine, readEpd, runSuite
+
+SUITE = """# the second count of the second position is wrong
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - ;D1 20 ;D2 400 ;D3 8902
+8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - ;D1 14 ;D2 190 ;D3 2812
+
+r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1 ;D1 6 ;D2 264
+"""
+
+
+class TestPerftSuite(unittest.TestCase):
+    def test_parse_epd_line(self):
+        fen, expected = parseEpdLine("8/8/8/8/8/8/8/K6k w - - ;D1 3 ;D2 9")
+        self.assertEqual(fen, "8/8/8/8/8/8/8/K6k w - - 0 1")
+        self.assertEqual(expected, {1: 3, 2: 9})
+
+    def test_suite_reports_failures(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "suite.epd")
+            with open(path, "w") as epdFile:
+                epdFile.write(SUITE)
+            lines = []
+            summary = runSuite(readEpd(path), 2, 3, report=lines.append)
+
+        self.assertEqual(summary["positions"], 3)
+        self.assertEqual(
+            summary["failures"], ["8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"]
+        )
+        self.assertEqual(summary["nodes"], 20 + 400 + 8902 + 14 + 191 + 6 + 264)
+        self.assertIn("divide at depth 2:", lines)
+        self.assertIn("  g2g3: 4", lines)
+
+    def test_divide_diff(self):
+        counts = {"e2e4": 20, "d2d4": 21, "a2a3": 20}
+        reference = {"e2e4": 20, "d2d4": 20, "g1f3": 20}
+        self.assertEqual(
+            divideDiff(counts, reference),
+            [
+                "a2a3: 20 (illegal in the reference)",
+                "d2d4: 21, reference 20",
+                "g1f3: missing, reference 20",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -51,6 +51,35 @@ class TestPerft(unittest.TestCase):
         for i in range(4):
             self.assertEqual(board.perft(i), results[i])
 
+    def test_make_unmake_mode(self):
+        board = Board(copyMake=False)
+        board.setToFen(
+            "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        )
+        results = [1, 48, 2039, 97862]
+        for i in range(4):
+            self.assertEqual(board.perft(i), results[i])
+
+    def test_perft_stats(self):
+        # Reference: https://www.chessprogramming.org/Perft_Results
+        board = Board()
+        board.setToFen("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1")
+        self.assertEqual(
+            list(board.perftStats(3).values()), [2812, 209, 2, 0, 0, 267, 3, 0, 0]
+        )
+        board.setToFen(
+            "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1"
+        )
+        self.assertEqual(
+            list(board.perftStats(3).values()), [9467, 1021, 4, 0, 120, 38, 2, 0, 22]
+        )
+        board.setToFen(
+            "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+        )
+        self.assertEqual(
+            list(board.perftStats(2).values()), [2039, 351, 1, 91, 0, 3, 0, 0, 0]
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
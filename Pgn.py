@@ -0,0 +1,131 @@
+import re
+import sys
+import time
+
+from Board import Board
+from ChessFunctionsAndConstants import *
+from San import parseSan
+
+# Streaming reader for PGN files. Games are read line by line and handed out one at
+# a time, so files of any size can be processed in constant memory. Comments,
+# variations and numeric annotation glyphs are skipped, only the moves of the main
+# line are kept.
+# Reference: https://www.chessprogramming.org/Portable_Game_Notation
+
+HEADER_PATTERN = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<comment>\{[^}]*\}|;[^\n]*)
+    |(?P<nag>\$\d+)
+    |(?P<open>\()
+    |(?P<close>\))
+    |(?P<result>1-0|0-1|1/2-1/2|\*)
+    |(?P<number>\d+\.+)
+    |(?P<move>[^\s{}();$]+)
+    """,
+    re.VERBOSE,
+)
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+
+class PgnGame:
+    def __init__(self, headers: dict, moves: list[str], result: str) -> None:
+        self.headers = headers
+        # the moves of the main line in SAN
+        self.moves = moves
+        self.result = result
+
+    def startingFen(self) -> str:
+        return self.headers.get("FEN", INITIAL_POSITION_FEN)
+
+
+def parseMovetext(movetext: str) -> tuple[list[str], str]:
+    moves = []
+    result = "*"
+    variationDepth = 0
+    for match in TOKEN_PATTERN.finditer(movetext):
+        kind = match.lastgroup
+        if kind == "open":
+            variationDepth += 1
+        elif kind == "close":
+            variationDepth -= 1
+        elif variationDepth:
+            continue
+        elif kind == "move":
+            moves.append(match.group())
+        elif kind == "result":
+            result = match.group()
+    return moves, result
+
+
+def endsInComment(line: str, inComment: bool) -> bool:
+    # whether a {...} comment is still open at the end of the line
+    for character in line:
+        if inComment:
+            inComment = character != "}"
+        elif character == "{":
+            inComment = True
+        elif character == ";":
+            # the rest of the line is a comment
+            break
+    return inComment
+
+
+def readGames(source):
+    # yields the games of a PGN file given as a path or as an open text file
+    if isinstance(source, str):
+        with open(source, encoding="utf-8", errors="replace") as pgnFile:
+            yield from readGames(pgnFile)
+        return
+
+    headers = {}
+    movetext = []
+    inComment = False
+    for line in source:
+        if line.startswith("%") and not inComment:
+            # escaped line
+            continue
+        stripped = line.strip()
+        if inComment:
+            # a line of a comment may start with [ too, as in {... [%clk 0:01:00]}
+            movetext.append(line)
+            inComment = endsInComment(line, True)
+        elif stripped.startswith("["):
+            if movetext:
+                # the headers of the next game end the movetext of this one
+                yield PgnGame(headers, *parseMovetext("".join(movetext)))
+                headers, movetext = {}, []
+            match = HEADER_PATTERN.match(stripped)
+            if match:
+                headers[match.group(1)] = match.group(2).replace('\\"', '"')
+        elif stripped:
+            movetext.append(line)
+            inComment = endsInComment(line, False)
+    if headers or movetext:
+        yield PgnGame(headers, *parseMovetext("".join(movetext)))
+
+
+def replayGame(game: PgnGame, board: Board = None):
+    # yields the moves of the game while playing them on the board, which is left at
+    # the final position
+    if board is None:
+        board = Board()
+    board.setToFen(game.startingFen())
+    for san in game.moves:
+        move = parseSan(board, san)
+        board.make_move(move)
+        yield move
+
+
+if __name__ == "__main__":
+    # python Pgn.py <file>: replays every game and reports the speed
+    board = Board()
+    start = time.perf_counter()
+    gameCount = moveCount = 0
+    for game in readGames(sys.argv[1]):
+        gameCount += 1
+        for move in replayGame(game, board):
+            moveCount += 1
+    seconds = time.perf_counter() - start
+    print(f"{gameCount} games, {moveCount} moves in {seconds:.2f}s")
+    print(f"{int(moveCount / max(seconds, 1e-9))} moves per second")
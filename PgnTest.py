@@ -0,0 +1,60 @@
+import io
+import unittest
+from Board import Board
+from Pgn import readGames, replayGame
+
+PGN = """[Event "Casual \\"blitz\\" game"]
+[White "A"]
+[Black "B"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 {the main line} Nc6 (2... d6 3. d4 (3. Bc4) exd4) 3. Bc4 $1
+Nf6?! 4. Ng5 d5 5. exd5 Nxd5?? 6. Nxf7 Kxf7 7. Qf3+ Ke6 8. Nc3 ; rest of line
+Ncb4 9. O-O c6 10. d4 1-0
+
+% an escaped line
+[Event "From a position"]
+[FEN "4k3/P7/8/8/8/8/8/4K3 w - - 0 1"]
+[SetUp "1"]
+
+1.a8=Q+ Kd7 2.Qb7+ *
+"""
+
+
+class TestPgn(unittest.TestCase):
+    def test_read_games(self):
+        games = list(readGames(io.StringIO(PGN)))
+        self.assertEqual(len(games), 2)
+        first, second = games
+        self.assertEqual(first.headers["Event"], 'Casual "blitz" game')
+        self.assertEqual(first.result, "1-0")
+        self.assertEqual(len(first.moves), 19)
+        self.assertEqual(first.moves[:6], ["e4", "e5", "Nf3", "Nc6", "Bc4", "Nf6?!"])
+        self.assertEqual(second.moves, ["a8=Q+", "Kd7", "Qb7+"])
+        self.assertEqual(second.result, "*")
+
+    def test_comment_lines_starting_with_brackets(self):
+        pgn = (
+            '[Event "Clock"]\n\n'
+            "1. e4 {a comment\n"
+            "[that starts a line] } e5 2. Nf3 *\n"
+        )
+        (game,) = readGames(io.StringIO(pgn))
+        self.assertEqual(game.moves, ["e4", "e5", "Nf3"])
+        self.assertEqual(game.headers, {"Event": "Clock"})
+
+    def test_replay_games(self):
+        board = Board()
+        first, second = readGames(io.StringIO(PGN))
+        moves = list(replayGame(first, board))
+        self.assertEqual(str(moves[16]), "e1g1")
+        self.assertEqual(
+            board.getFen(),
+            "r1bq1b1r/pp4pp/2p1k3/3np3/1nBP4/2N2Q2/PPP2PPP/R1B2RK1 b - d3 0 10",
+        )
+        list(replayGame(second, board))
+        self.assertEqual(board.getFen(), "8/1Q1k4/8/8/8/8/8/4K3 b - - 2 2")
+
+
+if __name__ == "__main__":
+    unittest.main()
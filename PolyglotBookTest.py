@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from Board import Board
+from PolyglotBook import ENTRY, PolyglotBook, polyglotKey
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# keys listed in the Polyglot format specification
+KEYS = [
+    ([], 0x463B96181691FC9C),
+    (["e2e4"], 0x823C9B50FD114196),
+    (["e2e4", "d7d5", "e4e5", "f7f5"], 0x22A48B5A8E47FF78),
+    (["e2e4", "d7d5", "e4e5", "f7f5", "e1e2", "e8f7"], 0x00FDD303C946BDD9),
+    (["a2a4", "b7b5", "h2h4", "b5b4", "c2c4"], 0x3C8123EA7B067637),
+    (["a2a4", "b7b5", "h2h4", "b5b4", "c2c4", "b4c3", "a1a3"], 0x5C3F9B829B279560),
+]
+
+
+def polyglotMove(start: str, end: str) -> int:
+    # squares counted from a1
+    def square(name):
+        return (int(name[1]) - 1) * 8 + ord(name[0]) - ord("a")
+
+    return square(end) | square(start) << 6
+
+
+class TestPolyglotBook(unittest.TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.board.setToFen(STARTING_FEN)
+
+    def test_keys_match_specification(self):
+        for moves, key in KEYS:
+            self.board.setToFen(STARTING_FEN)
+            for move in moves:
+                self.board.make_move(self.board.parseMove(move))
+            self.assertEqual(polyglotKey(self.board), key)
+
+    def test_book_moves(self):
+        entries = [
+            (0x0000000000000001, polyglotMove("a2", "a3"), 1),
+            (0x463B96181691FC9C, polyglotMove("e2", "e4"), 3),
+            (0x463B96181691FC9C, polyglotMove("d2", "d4"), 1),
+            (0x463B96181691FC9C, polyglotMove("e2", "e5"), 1),
+            (0x823C9B50FD114196, polyglotMove("c7", "c5"), 1),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "book.bin")
+            with open(path, "wb") as bookFile:
+                for key, move, weight in entries:
+                    bookFile.write(ENTRY.pack(key, move, weight, 0))
+
+            with PolyglotBook(path, seed=1) as book:
+                # the illegal e2e5 entry is skipped
+                moves = book.bookMoves(self.board)
+                self.assertEqual(
+                    [(str(move), weight) for move, weight in moves],
+                    [("e2e4", 3), ("d2d4", 1)],
+                )
+                self.assertIn(str(book.chooseMove(self.board)), ["e2e4", "d2d4"])
+
+                self.board.make_move(self.board.parseMove("g1f3"))
+                self.assertIsNone(book.chooseMove(self.board))
+
+
+if __name__ == "__main__":
+    unittest.main()
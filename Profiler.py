@@ -0,0 +1,207 @@
+import argparse
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import tracemalloc
+from collections import Counter
+
+from Benchmark import PERFT_POSITIONS, SEARCH_POSITIONS
+from Board import Board
+
+# Profiles perft or search on a set of positions. The workload runs three times,
+# once under each tool, so that they do not distort each other:
+#   - cProfile for the time spent per function and the number of calls per node
+#   - tracemalloc and a line tracer for the memory allocated per node by line
+#   - a sampling profiler driven by SIGPROF that writes the sampled call stacks in
+#     the collapsed format read by flamegraph.pl and speedscope
+# The sampler needs setitimer and so only runs on unix systems.
+
+
+def runWorkload(board: Board, mode: str, fens: list[str], depth: int) -> int:
+    # returns the number of nodes visited
+    nodes = 0
+    for fen in fens:
+        board.setToFen(fen)
+        if mode == "perft":
+            nodes += board.perft(depth)
+        else:
+            board.transpositionTable.clear()
+            board.iterativeSearch(depth)
+            nodes += board.nodeCount
+    return nodes
+
+
+def functionName(filename: str, line: int, name: str) -> str:
+    if filename == "~":
+        # builtins are listed with their name only
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def profileFunctions(board, mode, fens, depth, top: int) -> tuple[int, list[str]]:
+    profile = cProfile.Profile()
+    profile.enable()
+    nodes = runWorkload(board, mode, fens, depth)
+    profile.disable()
+
+    stats = pstats.Stats(profile).stats
+    ranked = sorted(stats.items(), key=lambda item: -item[1][3])
+    report = [f"{'cumtime':>9} {'tottime':>9} {'calls':>10} {'calls/node':>10}  name"]
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in ranked[:top]:
+        report.append(
+            f"{cumtime:9.3f} {tottime:9.3f} {calls:10} {calls / max(nodes, 1):10.2f}  "
+            f"{functionName(filename, line, name)}"
+        )
+    return nodes, report
+
+
+class AllocationCounter:
+    # Counts the memory allocated by every line while it runs, including the
+    # temporary objects it frees again. The trace function is called before each
+    # line, reads how far the traced memory peaked above its level when the
+    # previous line started and resets the peak for the next one.
+    def __init__(self) -> None:
+        self.allocated = Counter()
+        self.allocations = Counter()
+        self.line = None
+        self.start = 0
+        self.traceFunction = self.trace
+
+    def trace(self, frame, event, argument):
+        current, peak = tracemalloc.get_traced_memory()
+        if self.line is not None and peak > self.start:
+            self.allocated[self.line] += peak - self.start
+            self.allocations[self.line] += 1
+        code = frame.f_code
+        self.line = (code.co_filename, frame.f_lineno) if event == "line" else None
+        # nothing the trace function allocates may be alive or freed once the line
+        # runs, or it would count for the line
+        del current, peak, code
+        tracemalloc.reset_peak()
+        self.start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        return self.traceFunction
+
+    def __enter__(self):
+        tracemalloc.start()
+        sys.settrace(self.traceFunction)
+        return self
+
+    def __exit__(self, *exception) -> None:
+        sys.settrace(None)
+        tracemalloc.stop()
+
+
+def profileAllocations(board, mode, fens, depth, top: int) -> list[str]:
+    with AllocationCounter() as counter:
+        nodes = runWorkload(board, mode, fens, depth)
+
+    total = sum(counter.allocated.values())
+    report = [
+        f"allocated: {total} bytes, {total / max(nodes, 1):.1f} per node",
+        f"{'bytes/node':>10} {'allocations/node':>16}  line",
+    ]
+    for (filename, line), size in counter.allocated.most_common(top):
+        allocations = counter.allocations[filename, line]
+        report.append(
+            f"{size / max(nodes, 1):10.2f} {allocations / max(nodes, 1):16.4f}  "
+            f"{os.path.basename(filename)}:{line}"
+        )
+    return report
+
+
+class StackSampler:
+    # Records the call stack of the main thread every interval seconds of CPU time
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks = Counter()
+
+    def sample(self, signalNumber, frame) -> None:
+        # the frames of the profiler itself are left out
+        stack = []
+        while frame is not None and frame.f_code is not runWorkload.__code__:
+            code = frame.f_code
+            stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self.previousHandler = signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return self
+
+    def __exit__(self, *exception) -> None:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self.previousHandler)
+
+    def writeCollapsed(self, path: str) -> None:
+        with open(path, "w") as collapsedFile:
+            for stack, count in self.stacks.most_common():
+                collapsedFile.write(f"{stack} {count}\n")
+
+
+def sampleStacks(board, mode, fens, depth, interval: float, path: str) -> list[str]:
+    with StackSampler(interval) as sampler:
+        runWorkload(board, mode, fens, depth)
+    sampler.writeCollapsed(path)
+    return [f"{sum(sampler.stacks.values())} samples written to {path}"]
+
+
+def profile(
+    mode: str,
+    fens: list[str],
+    depth: int,
+    top: int = 25,
+    collapsedPath: str = "profile.folded",
+    interval: float = 0.001,
+) -> str:
+    board = Board()
+    nodes, functionReport = profileFunctions(board, mode, fens, depth, top)
+    allocationReport = profileAllocations(board, mode, fens, depth, top)
+    report = [f"{mode} to depth {depth} on {len(fens)} positions: {nodes} nodes", ""]
+    report += ["== functions by cumulative time =="] + functionReport + [""]
+    report += ["== allocations by line =="] + allocationReport + [""]
+    if hasattr(signal, "setitimer"):
+        report += ["== sampled stacks =="]
+        report += sampleStacks(board, mode, fens, depth, interval, collapsedPath)
+    return "\n".join(report)
+
+
+def main(arguments: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Profile perft or search")
+    parser.add_argument("mode", choices=["perft", "search"])
+    parser.add_argument(
+        "--fen",
+        action="append",
+        help="position to profile, may be repeated (default: the benchmark positions)",
+    )
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--top", type=int, default=25, help="number of rows to report")
+    parser.add_argument("--collapsed", default="profile.folded")
+    parser.add_argument(
+        "--interval", type=float, default=0.001, help="seconds between stack samples"
+    )
+    options = parser.parse_args(arguments)
+
+    fens = options.fen
+    if not fens:
+        if options.mode == "perft":
+            fens = [fen for fen, depth in PERFT_POSITIONS]
+        else:
+            fens = SEARCH_POSITIONS
+    print(
+        profile(
+            options.mode,
+            fens,
+            options.depth,
+            options.top,
+            options.collapsed,
+            options.interval,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
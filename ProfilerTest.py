@@ -0,0 +1,28 @@
+import os
+import tempfile
+import unittest
+from Profiler import profile
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class TestProfiler(unittest.TestCase):
+    def test_report_and_collapsed_stacks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.folded")
+            report = profile("perft", [START_FEN], 3, 10, path, 0.0005)
+            self.assertIn("perft to depth 3 on 1 positions: 8902 nodes", report)
+            self.assertIn("Board.py:", report.split("== allocations")[0])
+            self.assertIn("bytes/node", report)
+            allocations = report.split("== allocations")[1].split("== sampled")[0]
+            self.assertIn("Board.py:", allocations)
+
+            with open(path) as collapsedFile:
+                for line in collapsedFile:
+                    stack, count = line.rsplit(" ", 1)
+                    self.assertTrue(stack.startswith("Board.py:perft"))
+                    self.assertGreater(int(count), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+import re
+
+from Board import Board
+from ChessFunctionsAndConstants import *
+from Move import Move
+
+# Standard algebraic notation, as used by EPD and PGN, e.g. Nbd7, exd6, e8=Q+, O-O
+# Reference: https://www.chessprogramming.org/Algebraic_Chess_Notation#SAN
+#
+# A SAN move names the kind of piece and the square it moves to, so instead of
+# generating every move of the position only the pieces of that kind which can reach
+# the square are looked up: the attack tables indexed by the destination give the
+# squares they can come from. Only those few candidates are tested for legality.
+
+SAN_PATTERN = re.compile(r"([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?")
+CASTLING_FLAGS = {"O-O": Move.kingCastle, "O-O-O": Move.queenCastle}
+# the castling right, the squares between king and rook, the squares the king may
+# not be attacked on and its start and end square
+CASTLING = {
+    (WHITE, Move.kingCastle): (WKMASK, WKEMPTYBB, (60, 61, 62), 60, 62),
+    (WHITE, Move.queenCastle): (WQMASK, WQEMPTYBB, (60, 59, 58), 60, 58),
+    (BLACK, Move.kingCastle): (BKMASK, BKEMPTYBB, (4, 5, 6), 4, 6),
+    (BLACK, Move.queenCastle): (BQMASK, BQEMPTYBB, (4, 3, 2), 4, 2),
+}
+
+
+def movesTo(board: Board, pieceType: int, end: int) -> list[Move]:
+    # the pseudo-legal moves of the side to move's pieces of one kind to one square,
+    # encoded like the move generators do
+    side = board.currentTurn
+    piece = side | pieceType
+    target = board.board[end]
+    if target != EMPTY and findPieceColor(target) == side:
+        return []
+    if pieceType == PAWN:
+        return pawnMovesTo(board, end)
+
+    pct = board.pct
+    occupied = board.bitboards[ALL]
+    if pieceType == KNIGHT:
+        origins = pct.knightAttackTable[end]
+    elif pieceType == BISHOP:
+        origins = pct.getBishopAttacks(end, occupied)
+    elif pieceType == ROOK:
+        origins = pct.getRookAttacks(end, occupied)
+    elif pieceType == QUEEN:
+        origins = pct.getBishopAttacks(end, occupied)
+        origins |= pct.getRookAttacks(end, occupied)
+    else:
+        origins = pct.kingAttackTable[end]
+    origins &= board.bitboards[piece]
+
+    flag = Move.quietMove if target == EMPTY else Move.capture
+    moves = []
+    while origins:
+        moves.append(Move(63 - getLSBIndex(origins), end, flag, piece, target))
+        origins = popLSB(origins)
+    return moves
+
+
+def pawnMovesTo(board: Board, end: int) -> list[Move]:
+    side = board.currentTurn
+    otherSide = (BLACK + WHITE) - side
+    piece = side | PAWN
+    # white pawns move towards the lower square indices
+    backwards = 8 if side == WHITE else -8
+    promotion = end < 8 if side == WHITE else end >= 56
+    target = board.board[end]
+
+    moves = []
+    if target == EMPTY:
+        start = end + backwards
+        if board.board[start] == piece:
+            flags = Move.promotionFlags if promotion else (Move.quietMove,)
+            moves += [Move(start, end, flag, piece) for flag in flags]
+        elif board.board[start] == EMPTY and end // 8 == (4 if side == WHITE else 3):
+            if board.board[start + backwards] == piece:
+                moves.append(Move(start + backwards, end, Move.doublePawnPush, piece))
+        if end != board.enPassantSquare:
+            return moves
+        flags = (Move.epCapture,)
+        target = otherSide | PAWN
+    else:
+        flags = Move.promotionCaptureFlags if promotion else (Move.capture,)
+
+    origins = board.pct.pawnAttackTable[otherSide][end] & board.bitboards[piece]
+    while origins:
+        start = 63 - getLSBIndex(origins)
+        moves += [Move(start, end, flag, piece, target) for flag in flags]
+        origins = popLSB(origins)
+    return moves
+
+
+def castlingMoves(board: Board, flag) -> list[Move]:
+    # checked like the move generators do, so a castling move found here is legal
+    side = board.currentTurn
+    right, between, kingPath, start, end = CASTLING[side, flag]
+    if not board.castlingRights & right or board.bitboards[ALL] & between:
+        return []
+    otherSide = (BLACK + WHITE) - side
+    if any(board.isSquareAttackedBy(square, otherSide) for square in kingPath):
+        return []
+    return [Move(start, end, flag, side | KING)]
+
+
+def isLegal(board: Board, move: Move) -> bool:
+    board.make_move(move)
+    legal = not board.kingCanBeCaptured()
+    board.unmake_move()
+    return legal
+
+
+def needsLegalityCheck(board: Board, move: Move, inCheck: bool) -> bool:
+    # A pseudo-legal move can only leave its own king attacked when the king is in
+    # check already, the king itself moves, a pawn captures en passant or the piece
+    # is pinned. A piece is pinned when a slider would attack the king without it,
+    # every other move is legal without making it.
+    # Reference: https://www.chessprogramming.org/Pin
+    if move.isCastling():
+        # the king may neither be in check nor pass an attacked square
+        return False
+    if inCheck or move.flag == Move.epCapture:
+        return True
+    if findPieceType(move.movingPiece) == KING:
+        return True
+    side = board.currentTurn
+    otherSide = (BLACK + WHITE) - side
+    kingSquare = 63 - getLSBIndex(board.bitboards[side | KING])
+    occupied = clearBit(board.bitboards[ALL], move.start)
+    queens = board.bitboards[otherSide | QUEEN]
+    bishopsQueens = board.bitboards[otherSide | BISHOP] | queens
+    rooksQueens = board.bitboards[otherSide | ROOK] | queens
+    return bool(
+        board.pct.getBishopAttacks(kingSquare, occupied) & bishopsQueens
+        or board.pct.getRookAttacks(kingSquare, occupied) & rooksQueens
+    )
+
+
+def hasLegalMove(board: Board) -> bool:
+    return any(isLegal(board, move) for move in board.generateMoves())
+
+
+def parseSan(board: Board, san: str) -> Move:
+    # annotations like + # ! ? are ignored, castling may be written with zeros
+    text = san.rstrip("+#!?").replace("0", "O")
+    if text in CASTLING_FLAGS:
+        candidates = castlingMoves(board, CASTLING_FLAGS[text])
+    else:
+        match = SAN_PATTERN.fullmatch(text)
+        if match is None:
+            raise ValueError(f"Invalid move: {san}")
+        pieceName, fromFile, fromRank, endSquare, promotion = match.groups()
+        pieceType = CHARACTER_TO_PIECE[pieceName.lower()] if pieceName else PAWN
+        candidates = movesTo(board, pieceType, squareNameToIndex(endSquare))
+        if fromFile:
+            fileIndex = fileNameToFileIndex(fromFile)
+            candidates = [move for move in candidates if move.start % 8 == fileIndex]
+        if fromRank:
+            row = 7 - rankNameToRankIndex(fromRank)
+            candidates = [move for move in candidates if move.start // 8 == row]
+        if promotion:
+            promotedType = CHARACTER_TO_PIECE[promotion.lower()]
+            candidates = [
+                move
+                for move in candidates
+                if findPieceType(move.promotedPiece()) == promotedType
+            ]
+        else:
+            candidates = [move for move in candidates if not move.isPromotion()]
+
+    if candidates:
+        inCheck = board.isInCheck()
+        candidates = [
+            move
+            for move in candidates
+            if not needsLegalityCheck(board, move, inCheck) or isLegal(board, move)
+        ]
+    if not candidates:
+        raise ValueError(f"Illegal move: {san}")
+    if len(candidates) > 1:
+        raise ValueError(f"Ambiguous move: {san}")
+    return candidates[0]
+
+
+def moveToSan(board: Board, move: Move) -> str:
+    # the move must be legal in the position on the board
+    if move.flag == Move.kingCastle:
+        san = "O-O"
+    elif move.flag == Move.queenCastle:
+        san = "O-O-O"
+    else:
+        pieceType = findPieceType(move.movingPiece)
+        endSquare = squareIndexToSquareName(move.end)
+        if pieceType == PAWN:
+            san = ""
+            if move.isMoveCapture():
+                san = squareIndexToSquareName(move.start)[0] + "x"
+            san += endSquare
+            if move.isPromotion():
+                promotedType = findPieceType(move.promotedPiece())
+                san += "=" + PIECE_TO_CHARACTER[promotedType].upper()
+        else:
+            san = PIECE_TO_CHARACTER[pieceType].upper()
+            san += disambiguation(board, move, movesTo(board, pieceType, move.end))
+            if move.isMoveCapture():
+                san += "x"
+            san += endSquare
+
+    board.make_move(move)
+    if board.isInCheck():
+        san += "+" if hasLegalMove(board) else "#"
+    board.unmake_move()
+    return san
+
+
+def disambiguation(board: Board, move: Move, sameDestination: list) -> str:
+    # the file, rank or square the piece moves from, when another piece of the same
+    # kind can move to the same square
+    others = [
+        other
+        for other in sameDestination
+        if other.start != move.start and isLegal(board, other)
+    ]
+    if not others:
+        return ""
+    startSquare = squareIndexToSquareName(move.start)
+    if all(other.start % 8 != move.start % 8 for other in others):
+        return startSquare[0]
+    if all(other.start // 8 != move.start // 8 for other in others):
+        return startSquare[1]
+    return startSquare
+
+
+def movesToSan(board: Board, moves: list) -> list[str]:
+    # writes a line of moves, like a principal variation, leaving the board as it was
+    sans = []
+    for move in moves:
+        sans.append(moveToSan(board, move))
+        board.make_move(move)
+    for move in moves:
+        board.unmake_move()
+    return sans
@@ -0,0 +1,72 @@
+import unittest
+from Board import Board
+from San import moveToSan, parseSan
+
+
+class TestSan(unittest.TestCase):
+    def assertRoundTrip(self, fen, sans):
+        board = Board()
+        board.setToFen(fen)
+        for san in sans:
+            move = parseSan(board, san)
+            self.assertEqual(moveToSan(board, move), san)
+
+    def test_disambiguation(self):
+        # knights on b1 and f3 can both reach d2, rooks on a1 and a5 both reach a3
+        self.assertRoundTrip(
+            "4k3/8/8/R7/8/5N2/8/RN2K3 w - - 0 1",
+            ["Nbd2", "Nfd2", "R1a3", "R5a3", "Ng5", "Ra8+"],
+        )
+        board = Board()
+        board.setToFen("4k3/8/8/R7/8/5N2/8/RN2K3 w - - 0 1")
+        with self.assertRaisesRegex(ValueError, "Ambiguous"):
+            parseSan(board, "Nd2")
+        # queens on a1, a3 and c1 can all reach b2
+        self.assertRoundTrip("4k3/8/8/8/8/Q7/8/Q1Q1K3 w - - 0 1", ["Qa1b2", "Qcb2"])
+
+    def test_special_moves(self):
+        self.assertRoundTrip(
+            "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+            ["O-O", "O-O-O", "Qxf6", "dxe6", "Nxf7", "gxh3"],
+        )
+        self.assertRoundTrip(
+            "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+            ["Kh1", "d4", "Rf2", "c5"],
+        )
+        self.assertRoundTrip("6k1/5ppp/8/8/8/8/1p3PPP/R5K1 b - - 0 1", ["bxa1=Q#"])
+
+    def test_pawn_moves(self):
+        board = Board()
+        board.setToFen("4k3/1P6/8/3pP3/8/8/6P1/4K3 w - d6 0 1")
+        for san, uci in [
+            ("exd6", "e5d6"),
+            ("e6", "e5e6"),
+            ("g4", "g2g4"),
+            ("b8=N", "b7b8n"),
+            ("b8Q+", "b7b8q"),
+        ]:
+            self.assertEqual(str(parseSan(board, san)), uci)
+
+    def test_lenient_parsing(self):
+        board = Board()
+        board.setToFen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        self.assertEqual(str(parseSan(board, "e4!?")), "e2e4")
+        self.assertEqual(str(parseSan(board, "Ng1f3")), "g1f3")
+        for san in ["e5", "Nd2", "Nc", "O-O"]:
+            with self.assertRaises(ValueError):
+                parseSan(board, san)
+
+    def test_pinned_pieces(self):
+        # the knight on e2 is pinned by the rook on e7, the bishop on d2 by the queen
+        board = Board()
+        board.setToFen("4k3/4r3/8/q7/8/8/3BN3/1N2K3 w - - 0 1")
+        self.assertEqual(str(parseSan(board, "Nc3")), "b1c3")
+        self.assertEqual(str(parseSan(board, "Bc3")), "d2c3")
+        with self.assertRaisesRegex(ValueError, "Illegal"):
+            parseSan(board, "Ng3")
+        with self.assertRaisesRegex(ValueError, "Illegal"):
+            parseSan(board, "Be3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import threading
+
+from Board import Board
+from ChessFunctionsAndConstants import *
+
+# Searches under the limits the command line tools take per position: a depth, a
+# node count and a time, any of which may be left out. The time limit is enforced
+# by a timer setting stopSearch, as the UCI front-end does.
+
+
+def searchPosition(
+    board: Board,
+    depth: int,
+    nodes: int = None,
+    seconds: float = None,
+    reportIteration=None,
+) -> int:
+    board.stopSearch = False
+    board.nodeLimit = nodes or INFINITY
+    timer = None
+    if seconds:
+        timer = threading.Timer(seconds, setattr, (board, "stopSearch", True))
+        timer.start()
+    score = board.iterativeSearch(depth, reportIteration)
+    if timer is not None:
+        timer.cancel()
+    return score
@@ -0,0 +1,119 @@
+import inspect
+import json
+import textwrap
+import time
+
+# Search statistics. Every line of a Board method that updates them ends with the
+# marker below. The methods are compiled twice: as written, which Board keeps under
+# the name with a WithStats suffix, and with the marked lines replaced by pass,
+# which becomes the regular method. Switching statistics off thus leaves the hot
+# loops exactly as they would be without them, instead of testing a flag per node.
+STATS_MARKER = "# stats"
+
+COUNTERS = [
+    "nodes",
+    "qnodes",
+    "perftNodes",
+    "ttProbes",
+    "ttHits",
+    "ttCutoffs",
+    "betaCutoffs",
+    "firstMoveCutoffs",
+    "nullMoveTries",
+    "nullMoveCutoffs",
+    "lmrReductions",
+    "lmrResearches",
+]
+
+
+def stripStatistics(function):
+    # compiles a copy of the function without the lines updating statistics, keeping
+    # the line numbers of the original for tracebacks
+    sourceLines, firstLine = inspect.getsourcelines(function)
+    lines = []
+    for line in textwrap.dedent("".join(sourceLines)).splitlines():
+        code = line.rstrip()
+        if code.endswith(STATS_MARKER):
+            indentation = code[: len(code) - len(code.lstrip())]
+            line = indentation + "pass"
+        lines.append(line)
+    source = "\n" * (firstLine - 1) + "\n".join(lines) + "\n"
+
+    namespace = {}
+    exec(
+        compile(source, inspect.getsourcefile(function), "exec"),
+        function.__globals__,
+        namespace,
+    )
+    stripped = namespace[function.__name__]
+    stripped.__qualname__ = function.__qualname__
+    return stripped
+
+
+class SearchStats:
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        for counter in COUNTERS:
+            setattr(self, counter, 0)
+        # (depth, nodes, seconds) of every completed iteration
+        self.iterations = []
+        self.iterationStart = 0
+        self.iterationNodes = 0
+
+    def startIteration(self) -> None:
+        self.iterationStart = time.perf_counter()
+        self.iterationNodes = self.nodes + self.qnodes
+
+    def endIteration(self, depth: int) -> None:
+        self.iterations.append(
+            (
+                depth,
+                self.nodes + self.qnodes - self.iterationNodes,
+                time.perf_counter() - self.iterationStart,
+            )
+        )
+
+    def effectiveBranchingFactors(self) -> dict:
+        # nodes of every iteration divided by the nodes of the one before
+        # Reference: https://www.chessprogramming.org/Branching_Factor
+        factors = {}
+        for (previousDepth, previousNodes, seconds), (depth, nodes, seconds) in zip(
+            self.iterations, self.iterations[1:]
+        ):
+            if previousNodes:
+                factors[depth] = nodes / previousNodes
+        return factors
+
+    def toDict(self) -> dict:
+        stats = {counter: getattr(self, counter) for counter in COUNTERS}
+        stats["firstMoveCutoffRate"] = rate(self.firstMoveCutoffs, self.betaCutoffs)
+        stats["ttHitRate"] = rate(self.ttHits, self.ttProbes)
+        stats["nullMoveSuccessRate"] = rate(self.nullMoveCutoffs, self.nullMoveTries)
+        # a reduced search succeeds when it does not have to be searched again
+        stats["lmrSuccessRate"] = rate(
+            self.lmrReductions - self.lmrResearches, self.lmrReductions
+        )
+        stats["effectiveBranchingFactors"] = self.effectiveBranchingFactors()
+        stats["iterations"] = [
+            {"depth": depth, "nodes": nodes, "seconds": seconds}
+            for depth, nodes, seconds in self.iterations
+        ]
+        return stats
+
+    def toJson(self) -> str:
+        return json.dumps(self.toDict())
+
+    def uciInfo(self) -> str:
+        stats = self.toDict()
+        fields = " ".join(
+            f"{name} {value:.3f}" if isinstance(value, float) else f"{name} {value}"
+            for name, value in stats.items()
+            if isinstance(value, (int, float))
+        )
+        return f"info string stats {fields}"
+
+
+def rate(count: int, total: int) -> float:
+    return count / total if total else 0.0
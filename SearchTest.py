@@ -0,0 +1,132 @@
+import unittest
+from Board import Board
+from ChessFunctionsAndConstants import MATE_BOUND, MATE_SCORE, squareNameToIndex
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+]
+
+
+def makeMoves(board, *moves):
+    for move in moves:
+        board.make_move(
+            next(legal for legal in board.legalMoves() if str(legal) == move)
+        )
+
+
+class TestSearch(unittest.TestCase):
+    def test_hash_is_updated_incrementally(self):
+        board = Board()
+        for fen in FENS:
+            board.setToFen(fen)
+            for move in board.legalMoves():
+                positionHash = board.hash
+                board.make_move(move)
+                self.assertEqual(board.hash, board.computeHash())
+                board.unmake_move()
+                self.assertEqual(board.hash, positionHash)
+
+    def test_staged_moves_match_generated_moves(self):
+        board = Board()
+        for fen in FENS:
+            board.setToFen(fen)
+            moves = board.generateMoves()
+            board.killerMoves[0] = [moves[-1], moves[0]]
+            staged = list(board.orderedMoves(0, moves[len(moves) // 2]))
+            self.assertEqual(len(staged), len(moves))
+            self.assertEqual(set(staged), set(moves))
+
+    def test_null_move_is_undone(self):
+        for copyMake in [True, False]:
+            board = Board(copyMake)
+            board.setToFen(
+                "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"
+            )
+            positionHash = board.hash
+            nodes = board.perft(2)
+            board.make_null_move()
+            self.assertEqual(board.hash, board.computeHash())
+            self.assertIsNone(board.enPassantSquare)
+            board.unmake_null_move()
+            self.assertEqual(board.hash, positionHash)
+            self.assertEqual(board.enPassantSquare, squareNameToIndex("f6"))
+            self.assertEqual(board.perft(2), nodes)
+
+    def test_finds_back_rank_mate(self):
+        board = Board()
+        board.setToFen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        board.search(2, True)
+        self.assertEqual(str(board.bestMove), "d1d8")
+
+    def test_detects_repetition(self):
+        board = Board()
+        board.setToFen(FENS[0])
+        for move in ["g1f3", "g8f6", "f3g1", "f6g8"]:
+            self.assertFalse(board.isRepetition())
+            makeMoves(board, move)
+        self.assertTrue(board.isRepetition())
+        self.assertFalse(board.isRepetition(2))
+        makeMoves(board, "g1f3", "g8f6", "f3g1", "f6g8")
+        self.assertTrue(board.isRepetition(2))
+        # a pawn move makes every earlier position unreachable
+        makeMoves(board, "e2e4", "g8f6", "g1f3", "f6g8", "f3g1")
+        self.assertFalse(board.isRepetition())
+
+    def test_principal_variation_is_legal(self):
+        board = Board()
+        board.setToFen(FENS[1])
+        score = board.iterativeSearch(3)
+        self.assertEqual(board.principalVariation[0], board.bestMove)
+        for move in board.principalVariation:
+            self.assertIn(move, board.legalMoves())
+            board.make_move(move)
+        self.assertLess(abs(score), MATE_BOUND)
+
+    def test_multi_pv_lines_are_distinct_and_ordered(self):
+        board = Board()
+        board.setToFen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        lines = board.multiPVSearch(2, 3)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(str(lines[0][0]), "d1d8")
+        self.assertEqual(lines[0][1], MATE_SCORE - 1)
+        moves = [move for move, score, principalVariation in lines]
+        self.assertEqual(len(set(moves)), 3)
+        for move, score, principalVariation in lines:
+            self.assertEqual(principalVariation[0], move)
+        scores = [score for move, score, principalVariation in lines]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertFalse(board.excludedRootMoves)
+
+    def test_statistics_only_when_enabled(self):
+        board = Board()
+        board.setToFen(FENS[1])
+        board.iterativeSearch(3)
+        nodes = board.nodeCount
+        self.assertEqual(board.stats.nodes, 0)
+
+        board.transpositionTable.clear()
+        board.enableStats()
+        board.iterativeSearch(3)
+        stats = board.stats.toDict()
+        self.assertEqual(board.nodeCount, nodes)
+        self.assertEqual(stats["nodes"] + stats["qnodes"], nodes)
+        self.assertEqual(
+            [iteration["depth"] for iteration in stats["iterations"]], [1, 2, 3]
+        )
+        self.assertLessEqual(stats["firstMoveCutoffs"], stats["betaCutoffs"])
+
+        board.disableStats()
+        board.perft(2)
+        self.assertEqual(board.stats.perftNodes, 0)
+
+    def test_mate_score_prefers_shorter_mate(self):
+        board = Board()
+        board.setToFen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        self.assertEqual(board.iterativeSearch(3), MATE_SCORE - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import argparse
+import statistics
+import sys
+import time
+
+from Board import Board
+from ChessFunctionsAndConstants import *
+from Parallel import boundedMap
+from San import parseSan
+from SearchLimits import searchPosition
+
+# Runs tactical test suites like WAC or ECM, EPD files whose positions name the
+# best moves (bm) or the moves to avoid (am) in SAN:
+#   2rr3k/pp3pp1/1nnqbN1p/3pN3/2pP4/2P3Q1/PPB4P/R4BK1 w - - bm Qg6; id "WAC.001";
+# Every position is searched under a time or node budget in a pool of processes.
+# A position counts as solved when the best move of the last completed iteration
+# is right, and is solved since the iteration that last changed it to a right move.
+# Reference: https://www.chessprogramming.org/Test-Positions
+
+# report how many positions were solved within these many seconds
+SOLVE_TIME_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60]
+
+
+def parseEpdLine(line: str) -> dict:
+    fields = line.split(None, 4)
+    position = {"fen": " ".join(fields[:4]) + " 0 1", "bm": [], "am": [], "id": ""}
+    operations = fields[4] if len(fields) > 4 else ""
+    for operation in operations.split(";"):
+        operands = operation.split(None, 1)
+        if len(operands) < 2:
+            continue
+        opcode, value = operands
+        if opcode in ("bm", "am"):
+            position[opcode] = value.split()
+        elif opcode == "id":
+            position["id"] = value.strip().strip('"')
+    return position
+
+
+def readEpd(path: str):
+    with open(path) as epdFile:
+        for line in epdFile:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield parseEpdLine(line)
+
+
+def solvePosition(position: dict, seconds: float, nodes: int) -> dict:
+    # runs in a worker process
+    board = Board()
+    result = {"id": position["id"] or position["fen"], "solved": False}
+    try:
+        board.setToFen(position["fen"])
+        bestMoves = {parseSan(board, san) for san in position["bm"]}
+        avoidMoves = {parseSan(board, san) for san in position["am"]}
+    except ValueError as error:
+        # a broken position fails on its own instead of stopping the suite
+        result.update(move=None, nodes=0, seconds=0.0, error=str(error))
+        return result
+
+    def isSolution(move) -> bool:
+        if bestMoves and move not in bestMoves:
+            return False
+        return move not in avoidMoves
+
+    solvedAt = None
+    start = time.perf_counter()
+
+    def reportIteration(depth: int, score: int, principalVariation: list) -> None:
+        nonlocal solvedAt
+        if not principalVariation or not isSolution(principalVariation[0]):
+            solvedAt = None
+        elif solvedAt is None:
+            solvedAt = (time.perf_counter() - start, board.nodeCount, depth)
+
+    searchPosition(board, MAX_DEPTH, nodes, seconds, reportIteration)
+
+    result["move"] = str(board.bestMove)
+    result["solved"] = solvedAt is not None
+    result["nodes"] = board.nodeCount
+    result["seconds"] = time.perf_counter() - start
+    if solvedAt is not None:
+        result["solveSeconds"], result["solveNodes"], result["solveDepth"] = solvedAt
+    return result
+
+
+def runSuite(
+    positions,
+    seconds: float = 1.0,
+    nodes: int = None,
+    workers: int = None,
+    report=print,
+) -> dict:
+    summary = {"positions": 0, "solved": 0, "errors": 0, "nodes": 0, "seconds": 0.0}
+    solveTimes = []
+    results = boundedMap(
+        solvePosition, ((position, seconds, nodes) for position in positions), workers
+    )
+    for result in results:
+        summary["positions"] += 1
+        summary["nodes"] += result["nodes"]
+        summary["seconds"] += result["seconds"]
+        if "error" in result:
+            summary["errors"] += 1
+            report(f"error {result['id']}: {result['error']}")
+        elif result["solved"]:
+            summary["solved"] += 1
+            solveTimes.append(result["solveSeconds"])
+            report(
+                f"solved {result['id']}: {result['move']} at depth "
+                f"{result['solveDepth']} after {result['solveSeconds']:.2f}s, "
+                f"{result['solveNodes']} nodes"
+            )
+        else:
+            report(f"failed {result['id']}: {result['move']}")
+
+    summary["nps"] = summary["nodes"] / max(summary["seconds"], 1e-9)
+    summary["solveTimes"] = sorted(solveTimes)
+    report(
+        f"{summary['solved']}/{summary['positions']} solved, {summary['errors']} "
+        f"errors, {summary['nodes']} nodes, {int(summary['nps'])} nps per worker"
+    )
+    if solveTimes:
+        report(
+            f"time to solution: mean {statistics.mean(solveTimes):.2f}s, "
+            f"median {statistics.median(solveTimes):.2f}s, max {max(solveTimes):.2f}s"
+        )
+        for bucket in SOLVE_TIME_BUCKETS:
+            if seconds and bucket > seconds:
+                break
+            solved = sum(1 for solveTime in solveTimes if solveTime <= bucket)
+            report(f"  solved within {bucket}s: {solved}")
+    return summary
+
+
+def main(arguments: list[str]) -> int:
+    parser = argparse.ArgumentParser(description="Run an EPD tactical test suite")
+    parser.add_argument("epd")
+    parser.add_argument(
+        "--movetime", type=float, help="seconds per position, 1 by default"
+    )
+    parser.add_argument("--nodes", type=int, help="nodes per position")
+    parser.add_argument("--workers", type=int, help="default: one per processor")
+    options = parser.parse_args(arguments)
+
+    seconds = options.movetime
+    if seconds is None and options.nodes is None:
+        seconds = 1.0
+    runSuite(readEpd(options.epd), seconds, options.nodes, options.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,41 @@
+import unittest
+from TacticsSuite import parseEpdLine, runSuite
+
+WAC_003 = '5rk1/1ppb3p/p1pb4/6q1/3P1p1r/2P1R2P/PP1BQ1P1/5RKN w - - bm Rg3; id "WAC.003";'
+
+
+class TestTacticsSuite(unittest.TestCase):
+    def test_parse_epd_line(self):
+        position = parseEpdLine(WAC_003)
+        self.assertEqual(
+            position["fen"], "5rk1/1ppb3p/p1pb4/6q1/3P1p1r/2P1R2P/PP1BQ1P1/5RKN w - - 0 1"
+        )
+        self.assertEqual(position["bm"], ["Rg3"])
+        self.assertEqual(position["id"], "WAC.003")
+
+    def test_solves_under_node_budget(self):
+        positions = [
+            parseEpdLine(WAC_003),
+            # the same position with the solution as the move to avoid
+            parseEpdLine(WAC_003.replace("bm", "am")),
+        ]
+        lines = []
+        summary = runSuite(positions, None, 5000, 1, lines.append)
+        self.assertEqual((summary["positions"], summary["solved"]), (2, 1))
+        self.assertTrue(lines[0].startswith("solved WAC.003: e3g3"))
+        self.assertEqual(len(summary["solveTimes"]), 1)
+
+    def test_bad_move_is_an_error_of_its_position(self):
+        positions = [
+            parseEpdLine(WAC_003.replace("Rg3", "Rg4")),
+            parseEpdLine(WAC_003),
+        ]
+        lines = []
+        summary = runSuite(positions, None, 5000, 1, lines.append)
+        self.assertEqual((summary["positions"], summary["errors"]), (2, 1))
+        self.assertEqual(summary["solved"], 1)
+        self.assertIn("error WAC.003: Illegal move: Rg4", lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,286 @@
+import argparse
+import math
+import sys
+
+from Board import Board
+from ChessFunctionsAndConstants import *
+from Parallel import boundedMap
+from San import parseSan
+from SearchLimits import searchPosition
+
+# Plays matches between two configurations of the engine, given as Board attributes
+# like useNullMove=false, to check whether a change makes it stronger. Every opening
+# is played twice with the colors swapped, several games at a time in a pool of
+# processes. The match stops as soon as the sequential probability ratio test
+# decides between the two Elo hypotheses.
+# Reference: https://www.chessprogramming.org/Match_Statistics
+# Reference: https://www.chessprogramming.org/Sequential_Probability_Ratio_Test
+
+OPENINGS = [
+    "e4 e5 Nf3 Nc6",
+    "e4 c5 Nf3 d6",
+    "e4 e6 d4 d5",
+    "e4 c6 d4 d5",
+    "d4 d5 c4 e6",
+    "d4 Nf6 c4 g6",
+    "c4 e5 Nc3 Nf6",
+    "Nf3 d5 g3 Nf6",
+]
+
+# games still running after this many plies are drawn
+MAX_GAME_PLIES = 300
+
+# the SPRT only starts deciding once this many games were played
+SPRT_MIN_GAMES = 10
+# lower bound of the per game variance, without it a match in which every game ends
+# the same way would have no variance and the SPRT could never decide
+SPRT_MIN_VARIANCE = 0.01
+
+# Board attributes that searchPosition sets before every move
+SEARCH_LIMIT_SETTINGS = ("nodeLimit", "stopSearch")
+
+
+def openingFens(lines: list[str]) -> list[str]:
+    # opening lines are moves in SAN from the starting position
+    board = Board()
+    fens = []
+    for line in lines:
+        board.setToFen(INITIAL_POSITION_FEN)
+        for san in line.split():
+            board.make_move(parseSan(board, san))
+        fens.append(board.getFen())
+    return fens
+
+
+def readOpenings(path: str) -> list[str]:
+    # one FEN or EPD position per line
+    fens = []
+    with open(path) as openingFile:
+        for line in openingFile:
+            fields = line.split()
+            if len(fields) < 4 or line.startswith("#"):
+                continue
+            if len(fields) >= 6 and fields[4].isdigit():
+                fens.append(" ".join(fields[:6]))
+            else:
+                fens.append(" ".join(fields[:4]) + " 0 1")
+    return fens
+
+
+def gameOver(board: Board):
+    # the result and the reason when the game on the board is over, otherwise None
+    if not board.legalMoves():
+        if board.isInCheck():
+            return ("0-1" if board.currentTurn == WHITE else "1-0"), "mate"
+        return "1/2-1/2", "stalemate"
+    if board.halfMoveCounter >= FIFTY_MOVE_LIMIT:
+        return "1/2-1/2", "fifty moves"
+    # the position occurs for the third time
+    if board.isRepetition(2):
+        return "1/2-1/2", "repetition"
+    return None
+
+
+def playGame(
+    number: int,
+    fen: str,
+    whiteConfig: dict,
+    blackConfig: dict,
+    depth: int,
+    nodes: int = None,
+    seconds: float = None,
+) -> dict:
+    # runs in a worker process, each side searches on its own Board
+    boards = {WHITE: Board(), BLACK: Board()}
+    for color, config in ((WHITE, whiteConfig), (BLACK, blackConfig)):
+        for name, value in config.items():
+            setattr(boards[color], name, value)
+        boards[color].setToFen(fen)
+
+    moves = []
+    referee = boards[WHITE]
+    outcome = gameOver(referee)
+    while outcome is None:
+        if len(moves) >= MAX_GAME_PLIES:
+            outcome = "1/2-1/2", "move limit"
+            break
+        board = boards[referee.currentTurn]
+        searchPosition(board, depth, nodes, seconds)
+        move = board.bestMove
+        if move is None:
+            # stopped before the first iteration completed
+            move = board.legalMoves()[0]
+        for board in boards.values():
+            board.make_move(move)
+        moves.append(str(move))
+        outcome = gameOver(referee)
+
+    result, reason = outcome
+    return {
+        "game": number,
+        "fen": fen,
+        "result": result,
+        "reason": reason,
+        "moves": moves,
+    }
+
+
+def scoreAndVariance(wins: int, losses: int, draws: int) -> tuple[float, float]:
+    # the mean score of the games and its variance per game
+    games = wins + losses + draws
+    score = (wins + draws / 2) / games
+    variance = (
+        wins * (1 - score) ** 2 + losses * score**2 + draws * (0.5 - score) ** 2
+    ) / games
+    return score, variance
+
+
+def eloDifference(wins: int, losses: int, draws: int) -> tuple[float, float]:
+    # the Elo difference and its 95% confidence margin
+    score, variance = scoreAndVariance(wins, losses, draws)
+    if score <= 0 or score >= 1:
+        return (math.inf if score >= 1 else -math.inf), math.inf
+    margin = 1.96 * math.sqrt(variance / (wins + losses + draws))
+    upper, lower = scoreToElo(score + margin), scoreToElo(score - margin)
+    return scoreToElo(score), (upper - lower) / 2
+
+
+def scoreToElo(score: float) -> float:
+    score = min(max(score, 1e-9), 1 - 1e-9)
+    return -400 * math.log10(1 / score - 1)
+
+
+def eloToScore(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def sprtLogLikelihoodRatio(
+    wins: int, losses: int, draws: int, elo0: float, elo1: float
+) -> float:
+    # generalized SPRT with the normal approximation of the game outcomes
+    if wins + losses + draws < SPRT_MIN_GAMES:
+        # the variance is not known well enough yet
+        return 0.0
+    score, variance = scoreAndVariance(wins, losses, draws)
+    variance = max(variance, SPRT_MIN_VARIANCE)
+    score0, score1 = eloToScore(elo0), eloToScore(elo1)
+    games = wins + losses + draws
+    return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+
+def sprtBounds(alpha: float, beta: float) -> tuple[float, float]:
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def playMatch(
+    configA: dict,
+    configB: dict,
+    openings: list[str],
+    games: int,
+    depth: int,
+    nodes: int = None,
+    seconds: float = None,
+    workers: int = None,
+    elo0: float = 0,
+    elo1: float = 5,
+    alpha: float = 0.05,
+    beta: float = 0.05,
+    report=print,
+) -> dict:
+    # counts wins, losses and draws of A against B until games were played or the
+    # SPRT is conclusive
+    def tasks():
+        for number in range(games):
+            fen = openings[number // 2 % len(openings)]
+            # every opening is played once with each color
+            if number % 2 == 0:
+                yield number, fen, configA, configB, depth, nodes, seconds
+            else:
+                yield number, fen, configB, configA, depth, nodes, seconds
+
+    lower, upper = sprtBounds(alpha, beta)
+    summary = {"wins": 0, "losses": 0, "draws": 0, "sprt": None}
+    for game in boundedMap(playGame, tasks(), workers, workers):
+        aIsWhite = game["game"] % 2 == 0
+        if game["result"] == "1/2-1/2":
+            summary["draws"] += 1
+        elif (game["result"] == "1-0") == aIsWhite:
+            summary["wins"] += 1
+        else:
+            summary["losses"] += 1
+
+        wins, losses, draws = summary["wins"], summary["losses"], summary["draws"]
+        elo, margin = eloDifference(wins, losses, draws)
+        llr = sprtLogLikelihoodRatio(wins, losses, draws, elo0, elo1)
+        summary["elo"], summary["margin"], summary["llr"] = elo, margin, llr
+        report(
+            f"game {game['game'] + 1}: {game['result']} ({game['reason']}) | "
+            f"+{wins} -{losses} ={draws} | elo {elo:.1f} +- {margin:.1f} | "
+            f"llr {llr:.2f} [{lower:.2f}, {upper:.2f}]"
+        )
+        if llr >= upper or llr <= lower:
+            summary["sprt"] = "H1" if llr >= upper else "H0"
+            hypothesis = elo1 if summary["sprt"] == "H1" else elo0
+            report(f"SPRT accepted {summary['sprt']}: elo difference {hypothesis}")
+            break
+    return summary
+
+
+def parseConfig(settings: list[str]) -> dict:
+    # name=value pairs of Board attributes, values are booleans or numbers
+    board = Board()
+    config = {}
+    for setting in settings or []:
+        name, value = setting.split("=", 1)
+        if not hasattr(board, name):
+            raise ValueError(f"Board has no setting {name}")
+        if name in SEARCH_LIMIT_SETTINGS:
+            raise ValueError(f"{name} is set per move, use --nodes or --movetime")
+        if value.lower() in ("true", "false"):
+            config[name] = value.lower() == "true"
+        else:
+            config[name] = float(value) if "." in value else int(value)
+    return config
+
+
+def main(arguments: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Match two engine configurations")
+    parser.add_argument("--a", action="append", help="setting of engine A, name=value")
+    parser.add_argument("--b", action="append", help="setting of engine B, name=value")
+    parser.add_argument("--openings", help="file of FENs, default: built in lines")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=3, help="depth limit per move")
+    parser.add_argument("--nodes", type=int, help="node limit per move")
+    parser.add_argument("--movetime", type=float, help="seconds per move")
+    parser.add_argument("--workers", type=int, help="default: one per processor")
+    parser.add_argument("--elo0", type=float, default=0)
+    parser.add_argument("--elo1", type=float, default=5)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    options = parser.parse_args(arguments)
+    try:
+        configA, configB = parseConfig(options.a), parseConfig(options.b)
+    except ValueError as error:
+        parser.error(str(error))
+
+    openings = (
+        readOpenings(options.openings) if options.openings else openingFens(OPENINGS)
+    )
+    playMatch(
+        configA,
+        configB,
+        openings,
+        options.games,
+        min(options.depth, MAX_DEPTH),
+        options.nodes,
+        options.movetime,
+        options.workers,
+        options.elo0,
+        options.elo1,
+        options.alpha,
+        options.beta,
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+import unittest
+from Board import Board
+from Tournament import (
+    eloDifference,
+    gameOver,
+    parseConfig,
+    playGame,
+    sprtBounds,
+    sprtLogLikelihoodRatio,
+)
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class TestTournament(unittest.TestCase):
+    def test_adjudication(self):
+        board = Board()
+        board.setToFen("7k/5Q2/8/8/8/8/8/K7 b - - 0 1")
+        self.assertEqual(gameOver(board), ("1/2-1/2", "stalemate"))
+        board.setToFen("R5k1/5ppp/8/8/8/8/5PPP/6K1 b - - 0 1")
+        self.assertEqual(gameOver(board), ("1-0", "mate"))
+        board.setToFen("8/8/8/4k3/8/8/8/4KQ2 w - - 100 80")
+        self.assertEqual(gameOver(board), ("1/2-1/2", "fifty moves"))
+
+        board.setToFen(START_FEN)
+        for move in ["g1f3", "g8f6", "f3g1", "f6g8"] * 2:
+            self.assertIsNone(gameOver(board))
+            board.make_move(board.parseMove(move))
+        self.assertEqual(gameOver(board), ("1/2-1/2", "repetition"))
+
+    def test_parse_config(self):
+        self.assertEqual(
+            parseConfig(["useNullMove=false", "useFutilityPruning=true"]),
+            {"useNullMove": False, "useFutilityPruning": True},
+        )
+        with self.assertRaisesRegex(ValueError, "useNullmove"):
+            parseConfig(["useNullmove=false"])
+        with self.assertRaisesRegex(ValueError, "nodeLimit is set per move"):
+            parseConfig(["nodeLimit=5000"])
+
+    def test_play_game(self):
+        game = playGame(0, "6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1", {}, {}, 2)
+        self.assertEqual((game["result"], game["reason"]), ("1-0", "mate"))
+        self.assertEqual(game["moves"], ["a1a8"])
+
+    def test_statistics(self):
+        elo, margin = eloDifference(60, 40, 0)
+        self.assertAlmostEqual(elo, 70.4, places=1)
+        self.assertGreater(margin, 0)
+        self.assertEqual(eloDifference(10, 10, 20)[0], 0)
+
+        lower, upper = sprtBounds(0.05, 0.05)
+        self.assertAlmostEqual(upper, 2.944, places=3)
+        self.assertGreater(sprtLogLikelihoodRatio(600, 400, 1000, 0, 5), upper)
+        self.assertLess(sprtLogLikelihoodRatio(400, 600, 1000, 0, 5), lower)
+        self.assertEqual(sprtLogLikelihoodRatio(0, 0, 9, 0, 5), 0)
+        self.assertEqual(sprtLogLikelihoodRatio(3, 0, 5, 0, 5), 0)
+        # a side that never loses must still be able to pass the test
+        self.assertGreater(sprtLogLikelihoodRatio(80, 0, 120, 0, 5), upper)
+
+    def test_sprt_decides_one_sided_matches(self):
+        lower, upper = sprtBounds(0.05, 0.05)
+        self.assertGreater(sprtLogLikelihoodRatio(20, 0, 0, 0, 5), upper)
+        self.assertLess(sprtLogLikelihoodRatio(0, 20, 0, 0, 5), lower)
+        # draws only speak for equal strength, but not yet after a few games
+        self.assertLess(sprtLogLikelihoodRatio(0, 0, 20, 0, 5), 0)
+        self.assertGreater(sprtLogLikelihoodRatio(0, 0, 20, 0, 5), lower)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import io
+import unittest
+from uci import UciEngine, formatScore
+from ChessFunctionsAndConstants import MATE_SCORE
+
+
+class TestUci(unittest.TestCase):
+    def setUp(self):
+        self.output = io.StringIO()
+        self.engine = UciEngine(self.output)
+
+    def lines(self):
+        return self.output.getvalue().splitlines()
+
+    def test_handshake(self):
+        self.engine.handleCommand("uci")
+        self.engine.handleCommand("isready")
+        self.assertEqual(self.lines()[-2:], ["uciok", "readyok"])
+        self.assertFalse(self.engine.handleCommand("quit"))
+
+    def test_position_with_moves(self):
+        self.engine.handleCommand("position startpos moves e2e4 e7e5 g1f3")
+        self.assertEqual(
+            [str(move) for move in self.engine.board.moveStack],
+            ["e2e4", "e7e5", "g1f3"],
+        )
+        self.engine.handleCommand(
+            "position fen 8/8/8/8/8/8/4k3/K7 b - - 0 1 moves e2d2"
+        )
+        self.assertEqual(str(self.engine.board.moveStack[-1]), "e2d2")
+
+    def test_bad_position_keeps_previous_one(self):
+        self.engine.handleCommand("position startpos moves e2e4 e7e5")
+        for command in [
+            "position startpos moves g1f3 e2e5",
+            "position fen rnbqkXnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+            "position fen 8/8/8 w",
+            "position",
+        ]:
+            self.assertTrue(self.engine.handleCommand(command))
+            self.assertTrue(self.lines()[-1].startswith("info string "))
+            self.assertEqual(
+                [str(move) for move in self.engine.board.moveStack], ["e2e4", "e7e5"]
+            )
+        self.assertEqual(self.lines()[0], "info string Illegal move: e2e5")
+
+    def test_go_depth_reports_best_move(self):
+        self.engine.handleCommand("position fen 6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        self.engine.handleCommand("go depth 2")
+        self.engine.waitForSearch()
+        lines = self.lines()
+        self.assertTrue(lines[-2].startswith("info depth 2 score mate 1 "))
+        self.assertTrue(lines[-2].endswith("pv d1d8"))
+        self.assertEqual(lines[-1], "bestmove d1d8")
+
+    def test_stop_returns_legal_move(self):
+        self.engine.handleCommand("position startpos")
+        self.engine.handleCommand("go infinite")
+        self.engine.handleCommand("stop")
+        bestMove = self.lines()[-1].split()[1]
+        self.assertIn(bestMove, [str(move) for move in self.engine.board.legalMoves()])
+
+    def test_ponder_waits_for_ponderhit(self):
+        self.engine.handleCommand("position startpos moves e2e4")
+        self.engine.handleCommand("go ponder depth 2")
+        self.engine.searchThread.join(timeout=2)
+        self.assertFalse(self.lines()[-1].startswith("bestmove"))
+        self.engine.handleCommand("ponderhit")
+        self.engine.waitForSearch()
+        self.assertRegex(self.lines()[-1], r"^bestmove \w{4} ponder \w{4}$")
+
+    def test_format_score(self):
+        self.assertEqual(formatScore(35), "cp 35")
+        self.assertEqual(formatScore(MATE_SCORE - 3), "mate 2")
+        self.assertEqual(formatScore(-MATE_SCORE + 2), "mate -1")
+
+
+if __name__ == "__main__":
+    unittest.main()
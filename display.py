@@ -4,7 +4,14 @@ import pygame.freetype
 from sys import exit
 from ChessFunctionsAndConstants import *
 import random
+import threading
+import os
 from Move import Move
+from PolyglotBook import PolyglotBook
+
+SEARCH_DEPTH=3
+# opening book consulted before searching, used when present
+BOOK_PATH='book.bin'
 
 
 class DisplayModule:
@@ -23,6 +30,18 @@ class DisplayModule:
         self.wp=pygame.transform.scale(pygame.image.load('images/wp.png'),(50,50))
         self.wq=pygame.transform.scale(pygame.image.load('images/wq.png'),(50,50))
         self.wr=pygame.transform.scale(pygame.image.load('images/wr.png'),(50,50))
+        # the engine ponders on a board of its own so the one drawn never changes under
+        # the player, sharing the transposition table keeps what it found
+        self.book=PolyglotBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
+        self.ponderBoard=Board()
+        self.ponderBoard.transpositionTable=self.board.transpositionTable
+        # the ponder board replays the game from here so it knows the positions played
+        self.startFen=self.board.getFen()
+        self.startPly=len(self.board.moveStack)
+        self.ponderThread=None
+        self.ponderMove=None
+        self.ponderHit=False
+        self.ponderDepth=0
         self.ptoi={'r':self.br,'n':self.bh,'b':self.bb,'q':self.bq,'k':self.bk,'p':self.bp,'R':self.wr,'N':self.wh,'B':self.wb,'Q':self.wq,'K':self.wk,'P':self.wp}
         pygame.init()
         size_x=600
@@ -85,18 +104,20 @@ class DisplayModule:
                             if valid==[]:
                                 movstate=1
                             if valid!=[]:
-                                self.board.make_move(valid[0])
+                                playerMove=valid[0]
+                                self.board.make_move(playerMove)
                                 valid=[]
                                 movstate=1
-                                self.board.search(3,True)
-                                if self.board.bestMove==None:
+                                bestMove=self.engineMove(playerMove)
+                                if bestMove==None:
                                     text=text_mod.render(f"""WHITE WINS!!!""",0,(255,255,255))
                                     pos=(70,550)
                                     screen.blit(text,pos)
                                     valid=[]
                                     status=1
                                 else:
-                                    self.board.make_move(self.board.bestMove)
+                                    self.board.make_move(bestMove)
+                                    self.startPondering()
             
             
             text=text_mod.render(f"""{"WHITE" if self.board.currentTurn==WHITE else "BLACK"} TO MOVE""",0,(255,255,255))
@@ -115,6 +136,59 @@ class DisplayModule:
             pygame.display.update()
             clock.tick(60)
 
+    def engineMove(self,playerMove):
+        if self.book is not None:
+            bookMove=self.book.chooseMove(self.board)
+            if bookMove is not None:
+                if self.ponderThread is not None:
+                    self.stopPondering()
+                return bookMove
+        # On a ponder hit the background search already works on this position and
+        # only has to reach the search depth, on a miss it is thrown away
+        if self.ponderThread is not None:
+            if playerMove==self.ponderMove:
+                self.ponderHit=True
+                if self.ponderDepth>=SEARCH_DEPTH:
+                    self.ponderBoard.stopSearch=True
+                self.ponderThread.join()
+                self.ponderThread=None
+                if self.ponderBoard.bestMove is not None:
+                    self.board.principalVariation=self.ponderBoard.principalVariation
+                    return self.ponderBoard.bestMove
+            else:
+                self.stopPondering()
+        self.board.iterativeSearch(SEARCH_DEPTH)
+        return self.board.bestMove
+
+    def startPondering(self):
+        # think on the player's time about the reply expected in the principal variation
+        # Reference: https://www.chessprogramming.org/Pondering
+        principalVariation=self.board.principalVariation
+        if len(principalVariation)<2 or principalVariation[0]!=self.board.moveStack[-1]:
+            return
+        self.ponderMove=principalVariation[1]
+        self.ponderHit=False
+        self.ponderDepth=0
+        # a FEN keeps no history, so the game is replayed for the search to see
+        # repetitions and the fifty-move rule
+        self.ponderBoard.setToFen(self.startFen)
+        for move in self.board.moveStack[self.startPly:]:
+            self.ponderBoard.make_move(move)
+        self.ponderBoard.make_move(self.ponderMove)
+        self.ponderBoard.stopSearch=False
+        self.ponderThread=threading.Thread(target=self.ponderBoard.iterativeSearch,args=(MAX_DEPTH,self.reportPonderIteration),daemon=True)
+        self.ponderThread.start()
+
+    def reportPonderIteration(self,depth,score,principalVariation):
+        self.ponderDepth=depth
+        if self.ponderHit and depth>=SEARCH_DEPTH:
+            self.ponderBoard.stopSearch=True
+
+    def stopPondering(self):
+        self.ponderBoard.stopSearch=True
+        self.ponderThread.join()
+        self.ponderThread=None
+
     def draw_peices(self):
         board=self.board.board
         for x in range(64):
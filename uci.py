@@ -0,0 +1,276 @@
+import sys
+import threading
+import time
+
+from Board import Board
+from ChessFunctionsAndConstants import *
+from PolyglotBook import PolyglotBook
+
+# Universal Chess Interface front-end, lets GUIs and match managers drive the engine
+# over stdin/stdout. Commands are read on the main thread while the search runs in a
+# worker thread, so stop can be handled while it thinks.
+# Reference: https://www.chessprogramming.org/UCI
+
+ENGINE_NAME = "bitboardchessengine"
+ENGINE_AUTHOR = "PremSagarS"
+
+# Without a fixed move time a game clock is spread over this many moves, leaving
+# a safety margin for the communication with the GUI
+MOVES_TO_GO = 30
+TIME_MARGIN = 0.05
+
+
+def formatScore(score: int) -> str:
+    if abs(score) > MATE_BOUND:
+        # UCI counts mates in moves, the search in plies
+        moves = (MATE_SCORE - abs(score) + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score}"
+
+
+class UciEngine:
+    def __init__(self, output=sys.stdout, bookPath: str = None) -> None:
+        self.board = Board()
+        self.output = output
+        self.book = PolyglotBook(bookPath) if bookPath else None
+        self.multiPV = 1
+        # the arguments of the last position command that could be set up
+        self.positionArguments = ["startpos"]
+        self.searchThread = None
+        self.stopTimer = None
+        self.searchStart = 0
+
+        # While pondering or searching infinitely the best move may only be reported
+        # once the GUI sends stop or ponderhit, even if the search already finished
+        self.bestMoveAllowed = threading.Event()
+        self.ponderSeconds = None
+
+    def send(self, line: str) -> None:
+        print(line, file=self.output, flush=True)
+
+    def handleCommand(self, line: str) -> bool:
+        # returns False once the engine should quit
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send("option name Book type string default <empty>")
+            self.send(f"option name MultiPV type spin default 1 min 1 max {MAX_MOVES}")
+            self.send("option name Stats type check default false")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self.setOption(arguments)
+        elif command == "ucinewgame":
+            self.stop()
+            self.board.transpositionTable.clear()
+            self.board.killerMoves = [[None, None] for ply in range(MAX_PLY)]
+        elif command == "position":
+            self.stop()
+            self.setPosition(arguments)
+        elif command == "go":
+            self.stop()
+            self.go(arguments)
+        elif command == "ponderhit":
+            self.ponderHit()
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self.stop()
+            return False
+
+        return True
+
+    def setOption(self, arguments: list[str]) -> None:
+        # setoption name <name> [value <value>]
+        if "value" not in arguments:
+            return
+        index = arguments.index("value")
+        name = " ".join(arguments[1:index])
+        value = " ".join(arguments[index + 1 :])
+
+        if name == "Book":
+            if self.book is not None:
+                self.book.close()
+            self.book = None if value in ("", "<empty>") else PolyglotBook(value)
+        elif name == "MultiPV":
+            self.multiPV = max(1, int(value))
+        elif name == "Stats":
+            if value == "true":
+                self.board.enableStats()
+            else:
+                self.board.disableStats()
+
+    def setPosition(self, arguments: list[str]) -> None:
+        # a position the GUI sent wrongly is reported and the previous one is kept
+        try:
+            self.loadPosition(arguments)
+        except ValueError as error:
+            self.send(f"info string {error}")
+            self.loadPosition(self.positionArguments)
+            return
+        self.positionArguments = arguments
+
+    def loadPosition(self, arguments: list[str]) -> None:
+        # position startpos|fen <fen> [moves <move>...]
+        moves = []
+        if "moves" in arguments:
+            index = arguments.index("moves")
+            moves = arguments[index + 1 :]
+            arguments = arguments[:index]
+
+        if arguments[:1] == ["startpos"]:
+            self.board.setToFen(INITIAL_POSITION_FEN)
+        elif arguments[:1] == ["fen"]:
+            fen = " ".join(arguments[1:])
+            try:
+                self.board.setToFen(fen)
+            except (ValueError, KeyError, IndexError):
+                raise ValueError(f"Invalid FEN: {fen}")
+        else:
+            raise ValueError("position needs startpos or fen")
+
+        for move in moves:
+            self.board.make_move(self.board.parseMove(move))
+
+    def go(self, arguments: list[str]) -> None:
+        # book moves are played without searching
+        thinking = "ponder" in arguments or "infinite" in arguments
+        if self.book is not None and not thinking:
+            bookMove = self.book.chooseMove(self.board)
+            if bookMove is not None:
+                self.send(f"bestmove {bookMove}")
+                return
+
+        limits = {}
+        for name, value in zip(arguments, arguments[1:]):
+            if name in ("depth", "movetime", "wtime", "btime", "winc", "binc", "nodes"):
+                limits[name] = int(value)
+
+        maxDepth = min(limits.get("depth", MAX_DEPTH), MAX_DEPTH)
+        self.board.nodeLimit = limits.get("nodes", INFINITY)
+        self.board.stopSearch = False
+
+        seconds = None
+        if "infinite" in arguments:
+            pass
+        elif "movetime" in limits:
+            seconds = limits["movetime"] / 1000
+        else:
+            side = "w" if self.board.currentTurn == WHITE else "b"
+            if f"{side}time" in limits:
+                remaining = limits[f"{side}time"] / 1000
+                increment = limits.get(f"{side}inc", 0) / 1000
+                seconds = min(remaining / MOVES_TO_GO + increment / 2, remaining)
+
+        # Pondering searches the position after the expected reply on the opponent's
+        # time. The time limit only starts once the reply is actually played.
+        # Reference: https://www.chessprogramming.org/Pondering
+        if "ponder" in arguments or "infinite" in arguments:
+            self.bestMoveAllowed.clear()
+            self.ponderSeconds = seconds
+        else:
+            self.bestMoveAllowed.set()
+            self.startTimer(seconds)
+
+        self.searchStart = time.perf_counter()
+        self.searchThread = threading.Thread(
+            target=self.search, args=(maxDepth,), daemon=True
+        )
+        self.searchThread.start()
+
+    def startTimer(self, seconds: float) -> None:
+        if seconds is None:
+            return
+        # the search stops early enough to send bestmove before the time is up
+        self.stopTimer = threading.Timer(max(seconds - TIME_MARGIN, 0), self.stopSearch)
+        self.stopTimer.start()
+
+    def search(self, maxDepth: int) -> None:
+        if self.multiPV > 1:
+            self.board.multiPVSearch(maxDepth, self.multiPV, self.reportLines)
+        else:
+            self.board.iterativeSearch(maxDepth, self.reportIteration)
+        self.bestMoveAllowed.wait()
+        if self.stopTimer is not None:
+            self.stopTimer.cancel()
+        if self.board.statsEnabled:
+            self.send(self.board.stats.uciInfo())
+
+        bestMove = self.board.bestMove
+        if bestMove is None:
+            # stopped before the first iteration completed
+            legalMoves = self.board.legalMoves()
+            bestMove = legalMoves[0] if legalMoves else None
+        if bestMove is None:
+            self.send("bestmove 0000")
+            return
+
+        # the reply expected in the principal variation is the move to ponder on
+        principalVariation = self.board.principalVariation
+        if len(principalVariation) > 1 and principalVariation[0] == bestMove:
+            self.send(f"bestmove {bestMove} ponder {principalVariation[1]}")
+        else:
+            self.send(f"bestmove {bestMove}")
+
+    def reportIteration(self, depth: int, score: int, principalVariation: list) -> None:
+        self.sendInfo(depth, score, principalVariation)
+
+    def reportLines(self, depth: int, lines: list) -> None:
+        for number, (move, score, principalVariation) in enumerate(lines, 1):
+            self.sendInfo(depth, score, principalVariation, f"multipv {number} ")
+
+    def sendInfo(
+        self, depth: int, score: int, principalVariation: list, line: str = ""
+    ) -> None:
+        elapsed = max(time.perf_counter() - self.searchStart, 1e-6)
+        nodes = self.board.nodeCount
+        self.send(
+            f"info depth {depth} {line}score {formatScore(score)} nodes {nodes} "
+            f"nps {int(nodes / elapsed)} time {int(elapsed * 1000)} "
+            f"pv {' '.join(str(move) for move in principalVariation)}"
+        )
+
+    def ponderHit(self) -> None:
+        # The expected reply was played: the ongoing search keeps its results and
+        # goes on as a normal search under the time limit of the go command
+        if self.searchThread is None:
+            return
+        self.bestMoveAllowed.set()
+        self.startTimer(self.ponderSeconds)
+
+    def stopSearch(self) -> None:
+        self.board.stopSearch = True
+        self.bestMoveAllowed.set()
+
+    def stop(self) -> None:
+        # stops a running search and waits for it to report its best move
+        if self.searchThread is not None:
+            self.stopSearch()
+        self.waitForSearch()
+
+    def waitForSearch(self) -> None:
+        if self.searchThread is None:
+            return
+        self.searchThread.join()
+        self.searchThread = None
+        if self.stopTimer is not None:
+            self.stopTimer.cancel()
+            self.stopTimer = None
+
+
+def main() -> None:
+    # the path of a Polyglot opening book can be given as the only argument
+    engine = UciEngine(bookPath=sys.argv[1] if len(sys.argv) > 1 else None)
+    for line in sys.stdin:
+        if not engine.handleCommand(line):
+            break
+
+
+if __name__ == "__main__":
+    main()